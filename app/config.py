@@ -1,3 +1,5 @@
+import os
+
 # Constants and configuration
 
 # Colors
@@ -13,4 +15,47 @@ MEDIA_CONTROLS_BG = (0, 0, 0, 180)  # RGBA with alpha
 MEDIA_CONTROLS_FG = (255, 255, 255)
 MEDIA_PROGRESS_BG = (60, 60, 60)
 MEDIA_PROGRESS_FG = (0, 140, 240)
-MEDIA_HOVER_COLOR = (100, 180, 255)
\ No newline at end of file
+MEDIA_HOVER_COLOR = (100, 180, 255)
+
+# Network settings
+# Override both to point the app at tools/standin_server.py
+API_BASE_URL = os.environ.get("NASA_API_BASE_URL", "https://images-api.nasa.gov")
+ASSET_BASE_URL = os.environ.get("NASA_ASSET_BASE_URL", "https://images-assets.nasa.gov")
+HTTP_POOL_CONNECTIONS = 4  # Number of per-host pools kept alive
+HTTP_POOL_MAXSIZE = 16  # Keep-alive connections per host
+HTTP_CONNECT_TIMEOUT = 5  # seconds
+HTTP_READ_TIMEOUT = 15  # seconds
+HTTP_PREWARM_HOSTS = [API_BASE_URL, ASSET_BASE_URL]
+API_PAGE_SIZE = 50  # Results requested per API page (the API allows up to 100)
+STREAM_CHUNK_SIZE = 64 * 1024  # Bytes read per step while parsing streamed responses
+
+
+# Cache settings
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".nasa_media_explorer")
+RESPONSE_CACHE_TTL = 10 * 60  # seconds a search response is served without revalidation
+RESPONSE_CACHE_STALE_TTL = 7 * 24 * 3600  # seconds a stale response may still be shown while revalidating
+RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+OFFLINE_MODE = os.environ.get("NASA_OFFLINE", "") not in ("", "0")  # Answer searches from the local index only (F9 toggles)
+THUMB_CACHE_MAX_BYTES = 48 * 1024 * 1024  # Decoded gallery thumbnails kept in memory
+PREVIEW_CACHE_MAX_BYTES = 256 * 1024 * 1024  # Decoded detail-view previews kept in memory
+IMAGE_CACHE_SHARDS = 8  # Independently locked LRU shards per image cache
+THUMB_STORE_MAX_BYTES = 256 * 1024 * 1024  # Decoded thumbnails persisted across sessions
+THUMB_STORE_NEGATIVE_TTL = 6 * 3600  # seconds a failed thumbnail URL is not retried
+THUMB_LOADER_WORKERS = 6  # Concurrent thumbnail downloads/decodes for the gallery
+THUMB_DECODER = os.environ.get("NASA_THUMB_DECODER", "auto")  # "auto", "turbojpeg", "draft" or "full"
+PYRAMID_MIN_SIDE = 2048  # Images at least this large are drawn through a tiled mipmap pyramid
+PYRAMID_TILE_SIZE = 512  # Tile edge in pixels
+PYRAMID_TILE_CACHE_BYTES = 96 * 1024 * 1024  # Scaled tiles kept for the current zoom level
+SCALED_SURFACE_CACHE_ENTRIES = 4  # Scaled copies kept so an unchanged view is a plain blit
+DECODE_PROCESSES = os.cpu_count() or 2  # Worker processes for image decoding (0 = decode in-thread)
+DECODE_POOL_MIN_BYTES = 16 * 1024  # Smaller images decode faster in-thread than the process round trip
+MEMORY_BUDGET_BYTES = 384 * 1024 * 1024  # Combined budget for all decoded media held in memory
+MEMORY_LOW_WATERMARK = 256 * 1024 * 1024  # Trim caches when the OS reports less RAM available
+MEMORY_POLL_INTERVAL = 5  # seconds between available-memory checks
+ENCODED_CACHE_MAX_BYTES = 96 * 1024 * 1024  # Downloaded (still compressed) image bytes kept in memory
+DETAIL_CACHE_TTL = 24 * 3600  # seconds an asset manifest/metadata/captions response is used without refetching
+DETAIL_CACHE_STALE_TTL = 30 * 24 * 3600  # seconds an expired one may still be shown when the network fails
+DETAIL_CACHE_MAX_BYTES = 32 * 1024 * 1024
+DETAIL_CACHE_MEMORY_ENTRIES = 256
+DETAIL_PREFETCH_DWELL = 0.35  # seconds the gallery selection must rest on a card before it is prefetched
+DETAIL_WINDOW_RADIUS = 2  # results prefetched on either side of the one shown in the detail view
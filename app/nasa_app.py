@@ -4,6 +4,10 @@ import time
 import math
 import threading
 from app.config import BLACK, BLUE, WHITE
+from services.http_client import get_http_client
+from services.async_core import get_async_core, dispatch, ASYNC_RESULT_EVENT
+from services.decode_pool import get_decode_pool
+from services.memory_governor import get_memory_governor
 from services.api_service import NasaApiService
 from services.image_service import ImageService, DetailFetcher
 from services.audio_service import AudioPlayer
@@ -41,6 +45,10 @@ class NasaApp:
         }
 
         # Services
+        self.http_client = get_http_client()
+        self.http_client.prewarm()
+        self.async_core = get_async_core()
+        get_memory_governor().start_monitor()
         self.api_service = NasaApiService()
         self.image_service = ImageService()
         self.video_player = VideoPlayer(size=(640, 360))
@@ -49,18 +57,22 @@ class NasaApp:
 
         # State
         self.lock = threading.Lock()
-        self.thread_pool = []
+        self.search_futures = []  # I/O loop futures of search pages being fetched
+        self.search_generation = 0  # Incremented for every search; older results are dropped
         self.detail_mode = False
 
         # Screens
         self.search_screen = SearchScreen(self.screen, self.WIDTH, self.HEIGHT, self.fonts,
                                           self.image_service, self.enter_detail)
         self.detail_screen = DetailScreen(self.screen, self.WIDTH, self.HEIGHT, self.fonts,
-                                          self.image_service, self.audio_player, self.video_player)
+                                          self.image_service, self.audio_player, self.video_player,
+                                          self.api_service.local_index)
 
-    def enter_detail(self, item):
-        """Enter detail view for an item."""
+    def enter_detail(self, result, index=None):
+        """Enter detail view for a SearchResult; index is its position in the search results."""
         self.detail_mode = True
+        self.detail_screen.set_results(self.search_screen.images, index)
+        item = result.to_item(self.api_service.local_index.details(result.nasa_id))
         self.detail_screen.set_detail_item(item, DetailFetcher)
 
     def start_search(self):
@@ -87,16 +99,47 @@ class NasaApp:
         self.search_screen.loading = True
         self.search_screen.status = "Searching..."
 
+        # Supersede the previous search: close its connections and ignore its results
+        self.search_generation += 1
+        generation = self.search_generation
+        if self.search_screen.cursor:
+            self.search_screen.cursor.cancel()
+
         def on_search_complete(items, api_log, error):
+            if generation != self.search_generation:
+                return
             self.search_screen.set_search_results(items, api_log, error)
             pygame.event.post(pygame.event.Event(pygame.USEREVENT, {}))
 
         if media_type == "album":
-            thread = self.api_service.search_album(keyword, count, on_search_complete)
+            cursor = self.api_service.album_cursor(keyword, count, generation)
         else:
-            thread = self.api_service.search_media(keyword, count, media_type, on_search_complete)
-
-        self.thread_pool.append(thread)
+            cursor = self.api_service.media_cursor(keyword, count, media_type, generation)
+
+        # Paint instant matches from the local index while the remote request is in flight
+        local = self.api_service.search_local(keyword, media_type) if media_type != "album" else []
+        if count:
+            local = local[:count]
+        if self.api_service.offline:
+            self.search_screen.attach_cursor(None)
+            self.search_screen.loading = False
+            self.search_screen.set_local_results(local, searching=False)
+            if not local:
+                self.search_screen.set_search_results([], None, "offline and no local matches")
+            self._mark_fetched(keyword, count_str)
+            return
+        self.search_screen.set_local_results(local)
+
+        # Attach the cursor before fetching so a cache hit cannot race the assignment
+        self.search_screen.attach_cursor(cursor)
+        self.search_futures = [f for f in self.search_futures if not f.done()]
+        future = cursor.fetch_next(on_search_complete)
+        if future:
+            self.search_futures.append(future)
+        self._mark_fetched(keyword, count_str)
+
+    def _mark_fetched(self, keyword, count_str):
+        """Record the parameters of the last search so auto-search does not repeat it."""
         self.search_screen.last_fetch_keyword = keyword
         self.search_screen.last_fetch_count = count_str
         self.search_screen.last_fetch_media_type = self.search_screen.selected_media_type
@@ -175,6 +218,15 @@ class NasaApp:
                 self.detail_screen.HEIGHT = self.HEIGHT
                 return True
 
+            # Toggle offline mode
+            elif event.key == pygame.K_F9:
+                self.api_service.offline = not self.api_service.offline
+                self.search_screen.status = ("Offline: searching the local index only" if self.api_service.offline
+                                             else "Online")
+                self.search_screen.last_fetch_keyword = ""  # Repeat the current search in the new mode
+                pygame.event.post(pygame.event.Event(pygame.USEREVENT, {}))
+                return True
+
             # Window scaling
             elif event.key in (pygame.K_PLUS, pygame.K_EQUALS) and event.mod & pygame.KMOD_CTRL:
                 if not self.fullscreen:
@@ -210,10 +262,18 @@ class NasaApp:
                     redraw = True
                     continue
 
+                # Completions of I/O coroutines run their callbacks here, on the pygame thread
+                if event.type == ASYNC_RESULT_EVENT:
+                    dispatch(event)
+                    redraw = True
+                    continue
+
                 if self.detail_mode:
                     result = self.detail_screen.handle_input(event)
                     if result is False:  # Exit detail mode
                         self.detail_mode = False
+                        # Return to the card last shown, which next/previous may have moved
+                        self.search_screen.select_result(self.detail_screen.result_index)
                     redraw = True
                 else:
                     if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION):
@@ -221,13 +281,15 @@ class NasaApp:
                         if result == "search":
                             self.start_search()
                         elif result and isinstance(result, tuple) and result[0] == "detail":
-                            self.enter_detail(result[1])
+                            self.enter_detail(*result[1:])
                         redraw = True
                     elif event.type == pygame.USEREVENT:
                         redraw = True
 
             # Auto-search handling - make sure this is not removed!
             if not self.detail_mode:
+                self.search_screen.update_prefetch()
+
                 if (self.search_screen.input_keyword != self.search_screen.last_keyword or
                         self.search_screen.input_count != self.search_screen.last_fetch_count or
                         self.search_screen.selected_media_type != self.search_screen.last_fetch_media_type):
@@ -240,9 +302,9 @@ class NasaApp:
                        self.search_screen.input_count != self.search_screen.last_fetch_count or
                        self.search_screen.selected_media_type != self.search_screen.last_fetch_media_type)):
 
+                    # A newer query supersedes one still loading, so no need to wait for it
                     if time.time() - self.search_screen.last_keyword_change > self.search_screen.fetch_delay:
-                        if not self.search_screen.loading:
-                            self.start_search()
+                        self.start_search()
 
             # Drawing
             if redraw:
@@ -260,5 +322,9 @@ class NasaApp:
         # Cleanup
         self.audio_player.cleanup()
         self.video_player.cleanup()
+        self.search_screen.thumb_loader.close()
+        self.async_core.close()
+        get_decode_pool().close()
+        self.http_client.close()
         pygame.quit()
         sys.exit()
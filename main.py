@@ -9,6 +9,8 @@ Requirements:
 - pillow (PIL)
 - opencv-python (cv2) - for video thumbnail extraction
 - python-vlc - for in-app video playback
+- aiohttp (optional) - native asyncio HTTP for the network core
+- orjson (optional) - faster JSON decoding of cached responses
 """
 
 from app.nasa_app import NasaApp
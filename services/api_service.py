@@ -1,99 +1,265 @@
-import json
 import threading
-import requests
+from urllib.parse import urlencode
+from app.config import API_BASE_URL, API_PAGE_SIZE, OFFLINE_MODE
+from services.response_cache import ResponseCache, CacheEntry
+from services.cancellation import CancelToken
+from services.single_flight import AsyncSingleFlight
+from services.async_core import get_async_core, post_result
+from services.search_result import SearchResult
+from services.local_index import LocalIndex
+from services.json_stream import CollectionStreamParser, loads
+
+
+class SearchCursor:
+    """Lazily fetches successive API pages of a search or album query."""
+
+    def __init__(self, service, endpoint, params, limit=None, page_size=API_PAGE_SIZE, generation=0):
+        self.service = service
+        self.generation = generation  # Identifies the search this cursor belongs to
+        self.token = CancelToken()
+        self.endpoint = endpoint
+        self.params = params
+        self.limit = limit
+        self.page_size = min(page_size, limit) if limit else page_size
+        self.pages = {}  # API page number -> list of items
+        self.total_hits = None
+        self.next_page = 1
+        self.exhausted = False
+        self.loading = False
+        self.future = None  # I/O loop future of the page being fetched
+        self.on_update = None  # Called instead of the fetch callback for follow-up deliveries
+        self.lock = threading.Lock()
+
+    @property
+    def items(self):
+        """All SearchResults loaded so far, in page order and truncated to the limit."""
+        items = []
+        for page in sorted(self.pages):
+            items.extend(self.pages[page])
+        return items[:self.limit] if self.limit else items
+
+    def total(self):
+        """Number of results this cursor will yield, or None until the first page lands."""
+        if self.total_hits is None:
+            return None
+        return min(self.total_hits, self.limit) if self.limit else self.total_hits
+
+    def has_more(self):
+        return not self.exhausted and not self.token.cancelled
+
+    def cancel(self):
+        """Abandon this search: close in-flight connections and drop late results."""
+        self.token.cancel()
+
+    def fetch_next(self, callback):
+        """Fetch the next API page on the I/O loop and return its future.
+
+        callback (and on_update for follow-up deliveries) run on the pygame thread.
+        """
+        with self.lock:
+            if self.loading or self.exhausted or self.token.cancelled:
+                return None
+            self.loading = True
+            page = self.next_page
+
+        self.future = self.service.core.submit(self._fetch_page(page, callback), self.token)
+        return self.future
+
+    async def _fetch_page(self, page, callback):
+        """Coroutine fetching a single API page."""
+        params = dict(self.params, page=page, page_size=self.page_size)
+
+        delivered = []
+        streamed = []  # Batches of this fetch stored so far
+
+        def on_page(page_data, api_log, error):
+            if self.token.cancelled:
+                return  # Superseded by a newer search
+            if error:
+                with self.lock:
+                    if streamed and not any(delivered):
+                        # The stream broke mid-page: the retry fetches the page again from the start
+                        self.pages.pop(page, None)
+                    self.loading = False
+                if callback:
+                    post_result(callback, self.items, api_log, error)
+                return
+
+            new_items = [SearchResult.from_item(item) for item in page_data["items"]]
+            with self.lock:
+                if page_data["append"]:
+                    # Streamed batch of a page still arriving; the first one replaces any leftovers
+                    if not streamed:
+                        self.pages[page] = []
+                    self.pages[page].extend(new_items)
+                    streamed.append(len(new_items))
+                else:
+                    # Whole page; a stale cached page may be redelivered once revalidated
+                    self.pages[page] = new_items
+                if page_data["total_hits"] is not None:
+                    self.total_hits = page_data["total_hits"]
+                if page_data["complete"]:
+                    self.next_page = max(self.next_page, page + 1)
+                    loaded = sum(len(p) for p in self.pages.values())
+                    total = self.total()
+                    self.exhausted = (len(self.pages[page]) < self.page_size or
+                                      (total is not None and loaded >= total))
+                    self.loading = False
+                first = not delivered
+                delivered.append(page_data["complete"])
+
+            # Later batches of the same fetch update the view instead of replacing it
+            handler = callback if first or not self.on_update else self.on_update
+            if handler:
+                post_result(handler, self.items, api_log, None)
+
+            # Remember everything we have seen for instant local and offline search
+            self.service.core.executor.submit(self.service.local_index.add_many, page_data["items"])
+
+        await self.service._fetch_collection(self.endpoint, params, on_page, self.token)
 
 
 class NasaApiService:
     """Service for interacting with NASA's API."""
 
-    def __init__(self):
-        self.base_url = "https://images-api.nasa.gov"
+    def __init__(self, response_cache=None, local_index=None, async_core=None):
+        self.base_url = API_BASE_URL
+        self.core = async_core or get_async_core()
+        self.local_index = local_index or LocalIndex()
+        self.offline = OFFLINE_MODE
+        self.response_cache = response_cache or ResponseCache()
+        self.inflight = AsyncSingleFlight("api")
         self.last_response = None
 
-    def search_media(self, keyword, count=None, media_type="image", callback=None):
-        """Search for NASA media with the given keyword and media type."""
-        thread = threading.Thread(
-            target=self._search_media_thread,
-            args=(keyword, count, media_type, callback)
-        )
-        thread.daemon = True
-        thread.start()
-        return thread
-
-    def _search_media_thread(self, keyword, count, media_type, callback):
-        """Thread function for searching media."""
-        try:
-            params = {"q": keyword}
-            if media_type != "all":
-                params["media_type"] = media_type
-            if count:
-                params["page_size"] = count
-
-            response = requests.get(f"{self.base_url}/search", params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            items = []
-            if "collection" in data and "items" in data["collection"]:
-                items = data["collection"]["items"]
-
-            # Limit results if count is specified
-            if count:
-                items = items[:count]
-
-            api_log = {
-                "url": response.url,
-                "method": "GET",
-                "status": response.status_code,
-                "params": params,
-                "response_snippet": json.dumps(data, indent=2)[:400]
-            }
+    def media_cursor(self, keyword, count=None, media_type="image", generation=0):
+        """Create a cursor over the search results for a keyword and media type."""
+        params = {"q": keyword}
+        if media_type != "all":
+            params["media_type"] = media_type
+        return SearchCursor(self, "/search", params, count, generation=generation)
 
-            if callback:
-                callback(items, api_log, None)
-        except Exception as e:
-            if callback:
-                callback([], None, str(e))
+    def album_cursor(self, album_name, count=None, generation=0):
+        """Create a cursor over the items of a NASA album."""
+        return SearchCursor(self, f"/album/{album_name}", {}, count, generation=generation)
+
+    def search_media(self, keyword, count=None, media_type="image", callback=None):
+        """Search for NASA media and return a cursor whose first page is already loading."""
+        cursor = self.media_cursor(keyword, count, media_type)
+        cursor.fetch_next(callback)
+        return cursor
 
     def search_album(self, album_name, count=None, callback=None):
-        """Search for a NASA album by name."""
-        thread = threading.Thread(
-            target=self._search_album_thread,
-            args=(album_name, count, callback)
-        )
-        thread.daemon = True
-        thread.start()
-        return thread
-
-    def _search_album_thread(self, album_name, count, callback):
-        """Thread function for searching albums."""
+        """Search for a NASA album by name and return a cursor whose first page is already loading."""
+        cursor = self.album_cursor(album_name, count)
+        cursor.fetch_next(callback)
+        return cursor
+
+    def search_local(self, keyword, media_type="all", limit=200):
+        """Search the local index of previously seen results."""
+        return self.local_index.search(keyword, media_type, limit)
+
+    async def _fetch_collection(self, endpoint, params, callback, token=None):
+        """Coroutine fetching a collection endpoint, serving from the response cache when possible.
+
+        callback receives (page, api_log, error) where page holds "items", "total_hits",
+        "append" (a streamed batch to add to what was delivered before) and "complete".
+        """
+        token = token or CancelToken()
+        key = ResponseCache.make_key(endpoint, params)
+        cached = await self.core.run_blocking(self.response_cache.get, key)
+        usable = cached is not None and self.response_cache.is_usable(cached)
+        streamed = []
+
+        def on_items(items, total_hits, complete, url, status, head):
+            streamed.append(complete)
+            page = {"items": items, "total_hits": total_hits, "append": True, "complete": complete}
+            callback(page, self._api_log(url, status, params, "miss", head), None)
+
         try:
-            params = {}
-            if count:
-                params["page_size"] = count
-
-            response = requests.get(f"{self.base_url}/album/{album_name}", params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            items = []
-            if "collection" in data and "items" in data["collection"]:
-                items = data["collection"]["items"]
-
-            # Limit results if count is specified
-            if count:
-                items = items[:count]
-
-            api_log = {
-                "url": response.url,
-                "method": "GET",
-                "status": response.status_code,
-                "params": params,
-                "response_snippet": json.dumps(data, indent=2)[:400]
-            }
+            if cached and self.response_cache.is_fresh(cached):
+                self._deliver(cached, params, callback, "hit")
+                return
 
-            if callback:
-                callback(items, api_log, None)
+            if usable:
+                # Stale-while-revalidate: paint from disk now, refresh below
+                self._deliver(cached, params, callback, "stale")
+
+            # Stream items to the screen only when nothing is shown from the cache yet. Searches
+            # joining this request share it; it is only cancelled once none of them wants it.
+            entry, state, page = await self.inflight.do(key, lambda: self._revalidate(
+                endpoint, params, key, cached, None if usable or not callback else on_items))
+            if usable and (state == "not-modified" or entry.body == cached.body):
+                return
+            if streamed:
+                return  # Already delivered batch by batch
+            if page is None:
+                self._deliver(entry, params, callback, state)
+            elif callback:
+                page = {"items": page["items"], "total_hits": page["total_hits"], "append": False, "complete": True}
+                callback(page, self._api_log(entry.url, entry.status, params, state, entry.body), None)
         except Exception as e:
+            if token.cancelled:
+                return  # Superseded; nobody is shown the error
+            if usable:
+                return  # Stale data is already on screen
             if callback:
-                callback([], None, str(e))
\ No newline at end of file
+                callback({}, None, str(e))
+
+    async def _revalidate(self, endpoint, params, key, cached, on_items=None):
+        """Issue a (conditional) request, parsing items as they stream in, and update the cache."""
+        headers = {}
+        if cached:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        url = f"{self.base_url}{endpoint}"
+        request_url = f"{url}?{urlencode(params)}" if params else url
+        parser = CollectionStreamParser()
+
+        def on_chunk(chunk):
+            items = parser.feed(chunk)
+            if items and on_items:
+                on_items(items, None, False, request_url, 200, parser.head)
+
+        # Streamed so items reach the screen while the rest of the page is still arriving
+        status, resp_headers, _, final_url = await self.core.fetch(url, params, headers, on_chunk)
+        if status == 304 and cached:
+            return await self.core.run_blocking(self.response_cache.touch, key) or cached, "not-modified", None
+        if status >= 400:
+            raise IOError(f"HTTP {status} for {final_url}")
+        items, total_hits = parser.finish()
+        if on_items:
+            on_items(items, total_hits, True, final_url, status, parser.head)
+
+        entry = CacheEntry(final_url, status, parser.body,
+                           resp_headers.get("ETag"), resp_headers.get("Last-Modified"))
+        await self.core.run_blocking(self.response_cache.put, key, entry)
+        return entry, "miss" if not cached else "refreshed", {"items": parser.items, "total_hits": total_hits}
+
+    def _deliver(self, entry, params, callback, cache_state):
+        """Parse a cached response body and pass its page to the callback."""
+        collection = loads(entry.body).get("collection", {})
+        page = {
+            "items": collection.get("items", []),
+            "total_hits": collection.get("metadata", {}).get("total_hits"),
+            "append": False,
+            "complete": True
+        }
+
+        if callback:
+            callback(page, self._api_log(entry.url, entry.status, params, cache_state, entry.body), None)
+
+    def _api_log(self, url, status, params, cache_state, body_head):
+        """Describe a response for the API panel; the snippet is cut from the raw body."""
+        api_log = {
+            "url": url,
+            "method": "GET",
+            "status": status,
+            "params": params,
+            "cache": cache_state,
+            "response_snippet": body_head[:400]
+        }
+        self.last_response = api_log
+        return api_log
@@ -0,0 +1,194 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, CancelledError as FutureCancelledError
+import pygame
+
+from app.config import HTTP_POOL_MAXSIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, STREAM_CHUNK_SIZE
+from services.http_client import get_http_client
+from services.cancellation import CancelToken, CancelledError
+from services.single_flight import AsyncSingleFlight
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+# Posted to the pygame queue to run a completion on the pygame thread; see post_result()
+ASYNC_RESULT_EVENT = pygame.USEREVENT + 2
+
+
+class _PendingFuture:
+    """Lets a CancelToken cancel a coroutine on the I/O loop the way it closes a streamed response."""
+
+    def __init__(self, future):
+        self.future = future
+
+    def close(self):
+        self.future.cancel()
+
+
+class AsyncCore:
+    """Background asyncio event loop that runs the app's network coroutines."""
+
+    def __init__(self, max_concurrency=HTTP_POOL_MAXSIZE):
+        self.loop = asyncio.new_event_loop()
+        self.max_concurrency = max_concurrency
+        # Used for blocking work: disk caches, decoding, and HTTP when aiohttp is not installed
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="io")
+        self.session = None
+        self.semaphore = None
+        self.inflight = AsyncSingleFlight("async")
+        self._ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.loop.call_soon(self._ready.set)
+        self.loop.run_forever()
+
+    def submit(self, coro, token=None):
+        """Schedule a coroutine on the I/O loop and return a concurrent.futures.Future.
+
+        Cancelling token cancels the coroutine, which closes the connections only it was waiting for.
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        if token is not None:
+            pending = _PendingFuture(future)
+            token.register(pending)
+            future.add_done_callback(lambda f: token.unregister(pending))
+        return future
+
+    def run(self, coro, token=None):
+        """Run a coroutine on the I/O loop and block until it finishes; not for use on the loop itself."""
+        try:
+            return self.submit(coro, token).result()
+        except FutureCancelledError:
+            raise CancelledError()
+
+    async def run_blocking(self, fn, *args, **kwargs):
+        """Run a blocking callable on the I/O executor."""
+        return await self.loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    def submit_blocking(self, fn, *args, **kwargs):
+        """Run a blocking callable on the I/O executor from any thread; return a concurrent.futures.Future."""
+        return self.submit(self.run_blocking(fn, *args, **kwargs))
+
+    async def _session(self):
+        if self.session is None:
+            timeout = aiohttp.ClientTimeout(sock_connect=HTTP_CONNECT_TIMEOUT, sock_read=HTTP_READ_TIMEOUT)
+            connector = aiohttp.TCPConnector(limit_per_host=HTTP_POOL_MAXSIZE)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self.session
+
+    async def get(self, url, params=None, headers=None):
+        """Fetch url and return (status, headers, body); identical concurrent GETs share one request."""
+        key = (url, tuple(sorted((params or {}).items())), tuple(sorted((headers or {}).items())))
+        status, resp_headers, body, _ = await self.inflight.do(key, lambda: self.fetch(url, params, headers))
+        return status, resp_headers, body
+
+    async def fetch(self, url, params=None, headers=None, on_chunk=None):
+        """GET url and return (status, headers, body, final_url); headers are case-insensitive.
+
+        With on_chunk, the body of a successful response is handed to it as it arrives instead of
+        being returned. Cancelling the awaiting task closes the connection.
+        """
+        async with self.semaphore:
+            if AIOHTTP_AVAILABLE:
+                session = await self._session()
+                async with session.get(url, params=params, headers=headers) as response:
+                    chunks = []
+                    async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                        if on_chunk and response.status < 300:
+                            on_chunk(chunk)
+                        else:
+                            chunks.append(chunk)
+                    return response.status, response.headers.copy(), b"".join(chunks), str(response.url)
+
+            token = CancelToken()
+            try:
+                return await self.run_blocking(self._blocking_fetch, url, params, headers, on_chunk, token)
+            except asyncio.CancelledError:
+                token.cancel()  # The executor thread cannot be interrupted; close its connection instead
+                raise
+
+    @staticmethod
+    def _blocking_fetch(url, params, headers, on_chunk, token):
+        """fetch() with requests, streaming the body so a cancelled request stops early."""
+        response = get_http_client().get(url, params=params, headers=headers, stream=True)
+        token.register(response)
+        try:
+            chunks = []
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                token.raise_if_cancelled()
+                if on_chunk and response.ok:
+                    on_chunk(chunk)
+                else:
+                    chunks.append(chunk)
+            # A closed connection ends the loop early; do not return the truncated body
+            token.raise_if_cancelled()
+            return response.status_code, response.headers, b"".join(chunks), response.url
+        except CancelledError:
+            raise
+        except Exception:
+            if token.cancelled:
+                raise CancelledError()
+            raise
+        finally:
+            token.unregister(response)
+            response.close()
+
+    def close(self):
+        """Close the HTTP session and stop the loop."""
+        async def _close():
+            if self.session:
+                await self.session.close()
+
+        try:
+            self.submit(_close()).result(timeout=2)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.executor.shutdown(wait=False)
+
+
+def post_result(callback, *args):
+    """Have dispatch() call callback(*args) on the pygame thread; safe to call from any thread."""
+    pygame.event.post(pygame.event.Event(ASYNC_RESULT_EVENT, {"callback": callback, "args": args}))
+
+
+def deliver(future, callback):
+    """Post a future's completion to the pygame loop, where dispatch() calls callback(result, error)."""
+    def _done(f):
+        if f.cancelled():
+            return
+        try:
+            result, error = f.result(), None
+        except Exception as e:
+            result, error = None, e
+        post_result(callback, result, error)
+
+    future.add_done_callback(_done)
+    return future
+
+
+def dispatch(event):
+    """Run a completion posted by post_result(); call from the pygame thread only."""
+    event.callback(*event.args)
+
+
+_shared_core = None
+_shared_lock = threading.Lock()
+
+
+def get_async_core():
+    """Return the process-wide I/O loop, starting it on first use."""
+    global _shared_core
+    with _shared_lock:
+        if _shared_core is None:
+            _shared_core = AsyncCore()
+        return _shared_core
@@ -3,7 +3,7 @@ import time
 import tempfile
 import threading
 import pygame
-import requests
+from services.http_client import get_http_client
 
 try:
     from mutagen.mp3 import MP3
@@ -65,7 +65,8 @@ class AudioCache:
 class AudioPlayer:
     """Service for playing audio files with streaming support."""
 
-    def __init__(self):
+    def __init__(self, http_client=None):
+        self.http = http_client or get_http_client()
         pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=4096)
         self.temp_dir = tempfile.mkdtemp()
         self.playing = False
@@ -224,7 +225,7 @@ class AudioPlayer:
             temp_file = os.path.join(self.temp_dir, filename)
 
             # Start streaming
-            with requests.get(url, stream=True) as response:
+            with self.http.get(url, stream=True) as response:
                 response.raise_for_status()
                 content_length = int(response.headers.get('content-length', 0))
 
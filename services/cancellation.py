@@ -0,0 +1,46 @@
+import threading
+
+
+class CancelledError(Exception):
+    """Raised when work is abandoned because its token was cancelled."""
+
+
+class CancelToken:
+    """Cancellation flag shared between a requester and its worker threads."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._resources = []
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        """Mark the work as cancelled and close any open network responses."""
+        with self._lock:
+            self._event.set()
+            resources, self._resources = self._resources, []
+        for resource in resources:
+            try:
+                resource.close()
+            except Exception:
+                pass
+
+    def register(self, resource):
+        """Close resource (e.g. a streamed response) as soon as the token is cancelled."""
+        with self._lock:
+            if not self._event.is_set():
+                self._resources.append(resource)
+                return
+        resource.close()
+
+    def unregister(self, resource):
+        with self._lock:
+            if resource in self._resources:
+                self._resources.remove(resource)
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise CancelledError()
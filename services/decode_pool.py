@@ -0,0 +1,75 @@
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+import pygame
+
+from app.config import DECODE_PROCESSES, DECODE_POOL_MIN_BYTES
+from services.image_decode import decode_image, get_decoder
+
+
+def _decode_job(data, max_size, thumbnail):
+    """Runs in a worker process: decode and hand the pixels back through shared memory."""
+    if thumbnail:
+        mode, size, pixels = get_decoder()(data, max_size)
+    else:
+        mode, size, pixels = decode_image(data, max_size)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(pixels)))
+    shm.buf[:len(pixels)] = pixels
+    name = shm.name
+    shm.close()  # The parent attaches by name and owns the block from here on
+    return name, mode, size
+
+
+class DecodePool:
+    """Process pool for heavy image decodes; pixels come back through shared memory, not pickling."""
+
+    def __init__(self, processes=DECODE_PROCESSES, min_bytes=DECODE_POOL_MIN_BYTES):
+        self.processes = processes
+        self.min_bytes = min_bytes
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def _executor(self):
+        with self.lock:
+            if self.executor is None:
+                # spawn: forking a process that runs VLC, SDL and I/O threads is not safe
+                self.executor = ProcessPoolExecutor(max_workers=self.processes,
+                                                    mp_context=multiprocessing.get_context("spawn"))
+            return self.executor
+
+    def wants(self, data):
+        """Whether data is big enough to be worth shipping to another process."""
+        return self.processes > 0 and len(data) >= self.min_bytes
+
+    def decode(self, data, max_size=None, thumbnail=False):
+        """Decode image bytes in a worker process; return (mode, size, pixels, surface)."""
+        name, mode, size = self._executor().submit(_decode_job, data, max_size, thumbnail).result()
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            # Copy out so the block can be released now; a surface over shm.buf would pin its fds
+            pixels = bytes(shm.buf[:size[0] * size[1] * len(mode)])
+        finally:
+            shm.close()
+            shm.unlink()
+        # frombuffer shares the copy with the surface instead of copying it a second time
+        return mode, size, pixels, pygame.image.frombuffer(pixels, size, mode)
+
+    def close(self):
+        with self.lock:
+            if self.executor:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+
+
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+
+def get_decode_pool():
+    """Return the process-wide decode pool; worker processes start on first use."""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = DecodePool()
+        return _shared_pool
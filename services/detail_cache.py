@@ -0,0 +1,80 @@
+import os
+import json
+import threading
+from collections import OrderedDict
+
+from app.config import (CACHE_DIR, DETAIL_CACHE_TTL, DETAIL_CACHE_STALE_TTL, DETAIL_CACHE_MAX_BYTES,
+                        DETAIL_CACHE_MEMORY_ENTRIES)
+from services.response_cache import ResponseCache, CacheEntry
+
+
+class DetailCache:
+    """Asset manifests, metadata and captions keyed by nasa_id: memory LRU in front of an on-disk store."""
+
+    def __init__(self, store=None, max_entries=DETAIL_CACHE_MEMORY_ENTRIES):
+        self.store = store or ResponseCache(os.path.join(CACHE_DIR, "details"), ttl=DETAIL_CACHE_TTL,
+                                            stale_ttl=DETAIL_CACHE_STALE_TTL, max_bytes=DETAIL_CACHE_MAX_BYTES)
+        self.max_entries = max_entries
+        # key -> CacheEntry holding JSON text: every get() parses its own copy, so callers may mutate it
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, nasa_id, endpoint):
+        return self.store.make_key(endpoint, {"nasa_id": nasa_id})
+
+    def get(self, nasa_id, endpoint, allow_stale=False):
+        """Return the cached result for nasa_id's endpoint, or None; stale results only if allow_stale."""
+        key = self._key(nasa_id, endpoint)
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                self.memory.move_to_end(key)
+
+        if entry is None:
+            entry = self.store.get(key)
+            if entry is not None:
+                self._remember(key, entry)
+
+        result = None
+        if entry is not None and (self.store.is_fresh(entry) or (allow_stale and self.store.is_usable(entry))):
+            try:
+                result = json.loads(entry.body)
+            except ValueError:
+                result = None
+        with self.lock:
+            if result is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return result
+
+    def put(self, nasa_id, endpoint, result):
+        """Store a non-empty result in memory and on disk."""
+        if not result:
+            return
+        key = self._key(nasa_id, endpoint)
+        entry = CacheEntry(endpoint, 200, json.dumps(result))
+        self._remember(key, entry)
+        self.store.put(key, entry)
+
+    def _remember(self, key, entry):
+        with self.lock:
+            self.memory[key] = entry
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.max_entries:
+                self.memory.popitem(last=False)
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_detail_cache():
+    """Return the process-wide detail cache."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = DetailCache()
+        return _shared_cache
@@ -0,0 +1,176 @@
+import time
+import threading
+
+from app.config import DETAIL_PREFETCH_DWELL, DETAIL_WINDOW_RADIUS
+from services.progressive_image import IMAGE_EXTENSIONS, rendition_chain
+from services.cancellation import CancelToken
+
+
+def content_files(files):
+    """Asset files worth showing; metadata sidecars (.json, .txt, .xml) are left out."""
+    filtered = []
+    for file in files or []:
+        filename = file.get("href", "").split("/")[-1].lower()
+        if (filename.endswith(".json") or
+                "metadata" in filename or
+                filename.endswith(".txt") or
+                filename.endswith(".xml")):
+            continue
+        filtered.append(file)
+    return filtered
+
+
+def first_preview_url(asset):
+    """URL of the first rendition the detail view will load for asset, or None for non-images."""
+    items = asset.get("collection", {}).get("items", []) if asset else []
+    files = content_files(items)
+    target = files[0].get("href") if files else None
+    if not target or not target.lower().endswith(IMAGE_EXTENSIONS):
+        return None
+    return rendition_chain(target, [f.get("href", "") for f in items])[0]
+
+
+class _Speculation:
+    """One speculative prefetch of an item's asset manifest and first preview rendition."""
+
+    def __init__(self, nasa_id):
+        self.nasa_id = nasa_id
+        self.token = CancelToken()
+        self.preview_url = None  # Rendition decoded into the preview cache
+        self.done = False
+
+    @property
+    def cancelled(self):
+        return self.token.cancelled
+
+    async def run(self, image_service, fetcher_class, is_video):
+        try:
+            fetcher = fetcher_class(self.nasa_id, is_video, None, None, None, token=self.token)
+            url = first_preview_url(await fetcher.fetch_asset_async())
+            if url:
+                await image_service.fetch_preview_surface_async(url)
+                self.preview_url = url
+        except Exception as e:
+            print(f"Prefetch of {self.nasa_id} failed: {e}")
+        finally:
+            self.done = True
+
+    def start(self, image_service, fetcher_class, is_video):
+        """Run on the I/O loop; cancelling the token cancels the coroutine and its downloads."""
+        image_service.core.submit(self.run(image_service, fetcher_class, is_video), self.token)
+
+
+class DetailPrefetcher:
+    """Loads the asset manifest and first preview rendition of the gallery card the user dwells on."""
+
+    def __init__(self, image_service, fetcher_class, dwell=DETAIL_PREFETCH_DWELL):
+        self.image_service = image_service
+        self.fetcher_class = fetcher_class
+        self.dwell = dwell
+        self.focus_id = None
+        self.focus_since = 0.0
+        self.current = None  # _Speculation for the focused item
+        self.lock = threading.Lock()
+        self.started = 0
+        self.cancelled = 0
+        self.hits = 0  # Speculated items that were then opened
+        self.ready = 0  # ... whose prefetch had already finished
+
+    def focus(self, result, idle=True):
+        """Report the SearchResult under the selection or pointer (None if none); call every frame.
+
+        Speculation only starts while idle, so it never competes with visible thumbnails.
+        """
+        nasa_id = result.nasa_id if result else None
+        if nasa_id != self.focus_id:
+            self.focus_id = nasa_id
+            self.focus_since = time.monotonic()
+            self.cancel()
+        elif (nasa_id and self.current is None and idle and
+              time.monotonic() - self.focus_since >= self.dwell):
+            self._start(result)
+
+    def _start(self, result):
+        spec = _Speculation(result.nasa_id)
+        with self.lock:
+            self.current = spec
+            self.started += 1
+        spec.start(self.image_service, self.fetcher_class, result.media_type == "video")
+
+    def cancel(self):
+        """Abandon the speculation in progress, aborting its download."""
+        with self.lock:
+            spec = self.current
+            self.current = None
+            if spec and not spec.done:
+                self.cancelled += 1
+        if spec and not spec.done:
+            spec.token.cancel()
+
+    def opened(self, nasa_id):
+        """Record that nasa_id's detail view was opened, for the hit rate."""
+        with self.lock:
+            spec = self.current
+            if spec and spec.nasa_id == nasa_id:
+                self.hits += 1
+                if spec.done:
+                    self.ready += 1
+
+    def stats(self):
+        with self.lock:
+            return {"started": self.started, "cancelled": self.cancelled, "hits": self.hits, "ready": self.ready,
+                    "hit_rate": self.hits / self.started if self.started else 0.0}
+
+
+class PrefetchWindow:
+    """Keeps the manifests and first renditions of the results around the shown one loaded.
+
+    slide() is called whenever the detail view moves; neighbours leaving the window are
+    cancelled and the renditions fetched for them dropped from the preview cache.
+    """
+
+    def __init__(self, image_service, fetcher_class, radius=DETAIL_WINDOW_RADIUS):
+        self.image_service = image_service
+        self.fetcher_class = fetcher_class
+        self.radius = radius
+        self.entries = {}  # nasa_id -> _Speculation
+        self.lock = threading.Lock()
+
+    def slide(self, results, index):
+        """Centre the window on results[index]."""
+        lo = max(0, index - self.radius)
+        hi = min(len(results), index + self.radius + 1)
+        wanted = {results[i].nasa_id: results[i] for i in range(lo, hi)}
+        # Nearest first, so the next and previous items are ready before the outer ones
+        order = sorted(range(lo, hi), key=lambda i: abs(i - index))
+
+        with self.lock:
+            leaving = [self.entries.pop(nasa_id) for nasa_id in list(self.entries) if nasa_id not in wanted]
+            starting = []
+            for i in order:
+                result = results[i]
+                if i != index and result.nasa_id not in self.entries:
+                    spec = _Speculation(result.nasa_id)
+                    self.entries[result.nasa_id] = spec
+                    starting.append((spec, result.media_type == "video"))
+        for spec in leaving:
+            self._evict(spec)
+        for spec, is_video in starting:
+            spec.start(self.image_service, self.fetcher_class, is_video)
+
+    def _evict(self, spec):
+        spec.token.cancel()
+        if spec.preview_url:
+            self.image_service.preview_cache.discard(spec.preview_url)
+
+    def ready(self, nasa_id):
+        """Whether nasa_id's prefetch has finished."""
+        spec = self.entries.get(nasa_id)
+        return bool(spec and spec.done and not spec.cancelled)
+
+    def clear(self):
+        with self.lock:
+            leaving = list(self.entries.values())
+            self.entries.clear()
+        for spec in leaving:
+            self._evict(spec)
@@ -0,0 +1,64 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.config import (HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_CONNECT_TIMEOUT,
+                        HTTP_READ_TIMEOUT, HTTP_PREWARM_HOSTS)
+
+
+class HttpClient:
+    """Shared HTTP client with per-host keep-alive connection pools."""
+
+    def __init__(self, pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE,
+                 timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)):
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.session = requests.Session()
+
+        # One adapter per scheme; urllib3 keeps a separate pool for every host behind it
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url, **kwargs):
+        """Issue a GET request over the shared connection pools."""
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def head(self, url, **kwargs):
+        """Issue a HEAD request over the shared connection pools."""
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.head(url, **kwargs)
+
+    def prewarm(self, hosts=None):
+        """Open keep-alive connections to the given hosts in the background."""
+        hosts = HTTP_PREWARM_HOSTS if hosts is None else hosts
+
+        def _prewarm():
+            for host in hosts:
+                try:
+                    self.head(host, allow_redirects=False).close()
+                except Exception:
+                    pass
+
+        thread = threading.Thread(target=_prewarm, daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        """Close all pooled connections."""
+        with self.lock:
+            self.session.close()
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_http_client():
+    """Return the process-wide HTTP client, creating it on first use."""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient()
+        return _shared_client
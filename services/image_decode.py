@@ -0,0 +1,106 @@
+import functools
+from io import BytesIO
+from PIL import Image, UnidentifiedImageError
+
+from app.config import THUMB_DECODER
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    _turbo = TurboJPEG()
+    TURBOJPEG_AVAILABLE = True
+except (ImportError, RuntimeError, OSError):
+    # RuntimeError/OSError: the Python binding is installed but libjpeg-turbo is not
+    _turbo = None
+    TURBOJPEG_AVAILABLE = False
+
+_JPEG_MAGIC = b"\xff\xd8"
+
+
+class DecodeError(ValueError):
+    """The data is not a decodable image, as opposed to a failure of the decoding machinery."""
+
+
+def _decoder(fn):
+    """Report Pillow/libjpeg-turbo failures on the data itself as DecodeError."""
+    @functools.wraps(fn)
+    def wrapper(data, size=None):
+        try:
+            return fn(data, size)
+        except DecodeError:
+            raise
+        except (UnidentifiedImageError, ValueError, OSError, SyntaxError) as e:
+            # SyntaxError: some Pillow plugins report malformed headers this way
+            raise DecodeError(str(e)) from e
+    return wrapper
+
+
+def _has_alpha(img):
+    return img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info)
+
+
+def _finish(img, thumb_size):
+    """Shrink to fit thumb_size and return (mode, size, pixels); opaque images stay RGB."""
+    img.thumbnail((thumb_size, thumb_size))
+    img = img.convert("RGBA" if _has_alpha(img) else "RGB")
+    return img.mode, img.size, img.tobytes()
+
+
+@_decoder
+def decode_full(data, thumb_size):
+    """Reference path: decode at native resolution, convert to RGBA, then shrink."""
+    img = Image.open(BytesIO(data))
+    img = img.convert("RGBA")
+    img.thumbnail((thumb_size, thumb_size))
+    return img.mode, img.size, img.tobytes()
+
+
+@_decoder
+def decode_draft(data, thumb_size):
+    """Let libjpeg scale by 1/2, 1/4 or 1/8 while decoding (Pillow draft mode)."""
+    img = Image.open(BytesIO(data))
+    if img.format == "JPEG":
+        img.draft("RGB", (thumb_size, thumb_size))
+    return _finish(img, thumb_size)
+
+
+@_decoder
+def decode_turbojpeg(data, thumb_size):
+    """Decode JPEGs with libjpeg-turbo at the smallest DCT scale still covering thumb_size."""
+    if _turbo is None or not data.startswith(_JPEG_MAGIC):
+        return decode_draft(data, thumb_size)
+
+    width, height = _turbo.decode_header(data)[:2]
+    longest = max(width, height)
+    factor = None
+    for num, denom in sorted(_turbo.scaling_factors, key=lambda f: f[0] / f[1]):
+        if longest * num / denom >= thumb_size:
+            factor = (num, denom)
+            break
+    pixels = _turbo.decode(data, pixel_format=TJPF_RGB, scaling_factor=factor)
+    return _finish(Image.fromarray(pixels, "RGB"), thumb_size)
+
+
+@_decoder
+def decode_image(data, max_size=None):
+    """Decode a preview image to (mode, size, pixels), optionally shrunk to fit max_size."""
+    img = Image.open(BytesIO(data))
+    if max_size:
+        if img.format == "JPEG":
+            img.draft("RGB", (max_size, max_size))
+        img.thumbnail((max_size, max_size))
+    img = img.convert("RGBA" if _has_alpha(img) else "RGB")
+    return img.mode, img.size, img.tobytes()
+
+
+DECODERS = {
+    "full": decode_full,
+    "draft": decode_draft,
+    "turbojpeg": decode_turbojpeg,
+}
+
+
+def get_decoder(name=THUMB_DECODER):
+    """Return the thumbnail decode function selected by name ("auto" picks the fastest available)."""
+    if name == "auto":
+        name = "turbojpeg" if TURBOJPEG_AVAILABLE else "draft"
+    return DECODERS[name]
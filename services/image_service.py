@@ -1,60 +1,284 @@
+import json
 import time
+import asyncio
 import threading
-import requests
-from io import BytesIO
-from PIL import Image
+from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
 import pygame
+from app.config import (API_BASE_URL, THUMB_CACHE_MAX_BYTES, PREVIEW_CACHE_MAX_BYTES, IMAGE_CACHE_SHARDS,
+                        ENCODED_CACHE_MAX_BYTES)
+from services.cancellation import CancelToken
+from services.async_core import get_async_core, post_result
+from services.thumbnail_store import ThumbnailStore
+from services.image_decode import get_decoder, decode_image, DecodeError
+from services.decode_pool import get_decode_pool
+from services.memory_governor import get_memory_governor, surface_bytes
+from services.detail_cache import get_detail_cache
+
+
+class HTTPStatusError(IOError):
+    """Raised when an image download returns an error status."""
+
+    def __init__(self, status, url):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+
+
+class _CacheShard:
+    """One lock-protected LRU segment of an ImageCache."""
+
+    __slots__ = ("lock", "entries", "bytes", "max_bytes", "hits", "misses", "evictions")
+
+    def __init__(self, max_bytes):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # url -> (surface, size, last_used), least recently used first
+        self.bytes = 0
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
 
 
 class ImageCache:
-    """Cache for storing loaded images."""
+    """Thread-safe, byte-budgeted LRU cache for loaded images."""
+
+    def __init__(self, max_bytes=THUMB_CACHE_MAX_BYTES, shards=IMAGE_CACHE_SHARDS, name="images", weight=1.0,
+                 governor=None):
+        self.name = name
+        self.max_bytes = max_bytes
+        # Each shard has its own lock so worker threads and the draw loop rarely contend
+        self.shards = [_CacheShard(max_bytes // shards) for _ in range(shards)]
+        self.governor = governor or get_memory_governor()
+        self.governor.register(self, weight)
 
-    def __init__(self, max_size=100):
-        self.cache = {}
-        self.max_size = max_size
+    def _shard(self, url):
+        return self.shards[hash(url) % len(self.shards)]
 
     def get(self, url):
         """Get an image from the cache if it exists."""
-        if url in self.cache:
-            self.cache[url] = (time.time(), self.cache[url][1])
-            return self.cache[url][1]
-        return None
+        shard = self._shard(url)
+        with shard.lock:
+            entry = shard.entries.get(url)
+            if entry is None:
+                shard.misses += 1
+                return None
+            shard.entries[url] = (entry[0], entry[1], time.monotonic())
+            shard.entries.move_to_end(url)
+            shard.hits += 1
+            return entry[0]
 
     def put(self, url, image):
-        """Add an image to the cache."""
-        if len(self.cache) >= self.max_size:
-            oldest_url = min(self.cache.items(), key=lambda x: x[1][0])[0]
-            del self.cache[oldest_url]
-        self.cache[url] = (time.time(), image)
+        """Add an image to the cache, evicting least recently used images over the byte budget."""
+        size = surface_bytes(image)
+        shard = self._shard(url)
+        if size > shard.max_bytes:
+            return  # Would flush the whole shard for one image
+        with shard.lock:
+            old = shard.entries.pop(url, None)
+            if old is not None:
+                shard.bytes -= old[1]
+            shard.entries[url] = (image, size, time.monotonic())
+            shard.bytes += size
+            while shard.bytes > shard.max_bytes:
+                _, (_, evicted_size, _) = shard.entries.popitem(last=False)
+                shard.bytes -= evicted_size
+                shard.evictions += 1
+        self.governor.enforce()
+
+    def peek(self, url):
+        """Get an image without touching recency or the hit counters (for per-frame drawing)."""
+        shard = self._shard(url)
+        with shard.lock:
+            entry = shard.entries.get(url)
+            return entry[0] if entry is not None else None
+
+    def __contains__(self, url):
+        """Membership test that does not touch recency or the hit counters."""
+        shard = self._shard(url)
+        with shard.lock:
+            return url in shard.entries
+
+    def discard(self, url):
+        """Remove url from the cache if present."""
+        shard = self._shard(url)
+        with shard.lock:
+            entry = shard.entries.pop(url, None)
+            if entry is not None:
+                shard.bytes -= entry[1]
+
+    def memory_bytes(self):
+        return self.bytes
+
+    def memory_oldest(self):
+        """Last-use time of the least recently used entry across shards (for the memory governor)."""
+        oldest = None
+        for shard in self.shards:
+            with shard.lock:
+                if shard.entries:
+                    last_used = next(iter(shard.entries.values()))[2]
+                    if oldest is None or last_used < oldest:
+                        oldest = last_used
+        return oldest
+
+    def memory_evict(self):
+        """Evict the least recently used entry across shards; return the bytes freed."""
+        victim = None
+        for shard in self.shards:
+            with shard.lock:
+                if shard.entries:
+                    last_used = next(iter(shard.entries.values()))[2]
+                    if victim is None or last_used < victim[1]:
+                        victim = (shard, last_used)
+        if victim is None:
+            return 0
+        shard = victim[0]
+        with shard.lock:
+            if not shard.entries:
+                return 0
+            _, (_, size, _) = shard.entries.popitem(last=False)
+            shard.bytes -= size
+            shard.evictions += 1
+            return size
+
+    def clear(self):
+        for shard in self.shards:
+            with shard.lock:
+                shard.entries.clear()
+                shard.bytes = 0
+
+    def __len__(self):
+        return sum(len(shard.entries) for shard in self.shards)
+
+    @property
+    def bytes(self):
+        return sum(shard.bytes for shard in self.shards)
+
+    def stats(self):
+        """Return counters for the API panel and diagnostics."""
+        hits = sum(shard.hits for shard in self.shards)
+        misses = sum(shard.misses for shard in self.shards)
+        evictions = sum(shard.evictions for shard in self.shards)
+        return {"name": self.name, "entries": len(self), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                "hits": hits, "misses": misses, "evictions": evictions,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0}
 
 
 class ImageService:
     """Service for fetching and processing images."""
 
-    def __init__(self):
-        self.image_cache = ImageCache()
+    def __init__(self, async_core=None, thumb_store=None, decode_pool=None):
+        self.image_cache = ImageCache(THUMB_CACHE_MAX_BYTES, name="thumbnails")
+        # Previews are large and few: one shard so a single original fits the whole budget;
+        # they are cheaper to rebuild from the disk/HTTP caches, so they go before thumbnails
+        self.preview_cache = ImageCache(PREVIEW_CACHE_MAX_BYTES, shards=1, name="previews", weight=2.0)
+        # Second tier: compressed bytes are 10-20x smaller than decoded surfaces, so evicted
+        # surfaces are re-decoded from RAM instead of downloaded again
+        self.encoded_cache = ImageCache(ENCODED_CACHE_MAX_BYTES, shards=4, name="compressed", weight=0.5)
+        self.core = async_core or get_async_core()
+        self.thumb_store = thumb_store or ThumbnailStore()
+        self.decode_pixels = get_decoder()
+        self.decode_pool = decode_pool or get_decode_pool()
+
+    def download(self, url, token=None):
+        """Download raw bytes for url from a worker thread; see download_async().
+
+        Cancelling token aborts the download (CancelledError) unless another caller still wants it.
+        """
+        return self.core.run(self.download_async(url), token)
+
+    async def download_async(self, url):
+        """Coroutine downloading raw bytes for url; concurrent callers share one request."""
+        data = self.encoded_cache.get(url)
+        if data is not None:
+            return data
+        status, _, body = await self.core.get(url)
+        if status >= 400:
+            raise HTTPStatusError(status, url)
+        self.encoded_cache.put(url, body)
+        return body
+
+    def _decode(self, data, max_size=None, thumbnail=False):
+        """Decode image bytes to (mode, size, pixels, surface), in the process pool when worthwhile."""
+        if self.decode_pool.wants(data):
+            try:
+                return self.decode_pool.decode(data, max_size, thumbnail)
+            except BrokenProcessPool:
+                print("Decode pool unavailable, decoding in-thread")
+                self.decode_pool.processes = 0
+        if thumbnail:
+            mode, size, pixels = self.decode_pixels(data, max_size)
+        else:
+            mode, size, pixels = decode_image(data, max_size)
+        return mode, size, pixels, pygame.image.fromstring(pixels, size, mode)
+
+    def _decode_thumbnail(self, data, thumb_size):
+        """Decode image bytes into a Pygame surface no larger than thumb_size."""
+        return self._decode(data, thumb_size, thumbnail=True)[3]
+
+    def _load_stored_thumbnail(self, url, thumb_size):
+        """Return (surface, known_bad) from the persistent thumbnail store."""
+        if self.thumb_store.is_failed(url, thumb_size):
+            return None, True
+        stored = self.thumb_store.get(url, thumb_size)
+        if stored is None:
+            return None, False
+        mode, size, pixels = stored
+        return pygame.image.fromstring(bytes(pixels), size, mode), False
+
+    def _decode_and_store(self, data, url, thumb_size):
+        """Decode a downloaded thumbnail and persist its pixels for later sessions."""
+        try:
+            mode, size, pixels, surf = self._decode(data, thumb_size, thumbnail=True)
+        except DecodeError:
+            self.thumb_store.mark_failed(url, thumb_size)  # Not an image; do not download it again
+            return None
+        self.thumb_store.put(url, thumb_size, mode, size, pixels)
+        return surf
+
+    def _record_failure(self, error, url, thumb_size):
+        # Only permanent HTTP errors are remembered; network errors are retried next time
+        if isinstance(error, HTTPStatusError) and 400 <= error.status < 500 and error.status != 429:
+            self.thumb_store.mark_failed(url, thumb_size)
 
     def fetch_image_surface(self, url, thumb_size):
         """Fetch image from URL and convert to Pygame surface."""
+        return self.core.run(self.fetch_image_surface_async(url, thumb_size))
+
+    async def fetch_image_surface_async(self, url, thumb_size):
+        """Coroutine fetching a thumbnail surface; None if it cannot be had."""
         cached = self.image_cache.get(url)
         if cached:
             return cached
 
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            img = Image.open(BytesIO(response.content))
-            img = img.convert("RGBA")
-            img.thumbnail((thumb_size, thumb_size))
-            mode = img.mode
-            size = img.size
-            data = img.tobytes()
-            surf = pygame.image.fromstring(data, size, mode)
-            self.image_cache.put(url, surf)
+            surf, known_bad = await self.core.run_blocking(self._load_stored_thumbnail, url, thumb_size)
+            if known_bad:
+                return None
+            if surf is None:
+                data = await self.download_async(url)
+                surf = await self.core.run_blocking(self._decode_and_store, data, url, thumb_size)
+            if surf:
+                self.image_cache.put(url, surf)
             return surf
-        except Exception:
+        except Exception as e:
+            self._record_failure(e, url, thumb_size)
             return None
 
+    def fetch_preview_surface(self, url, token=None):
+        """Fetch and decode a full preview rendition from a worker thread; see fetch_preview_surface_async()."""
+        return self.core.run(self.fetch_preview_surface_async(url), token)
+
+    async def fetch_preview_surface_async(self, url):
+        """Coroutine fetching and decoding a preview rendition, sharing it through the preview cache."""
+        cached = self.preview_cache.get(url)
+        if cached:
+            return cached
+
+        data = await self.download_async(url)
+        surf = (await self.core.run_blocking(self._decode, data))[3]
+        self.preview_cache.put(url, surf)
+        return surf
+
     def fetch_and_notify_thumb(self, url, idx, callback=None):
         """Fetch a thumbnail image and notify when complete."""
         surf = self.fetch_image_surface(url, 110)  # Default thumbnail size
@@ -63,42 +287,104 @@ class ImageService:
         pygame.event.post(pygame.event.Event(pygame.USEREVENT, {}))
 
 
-class DetailFetcher(threading.Thread):
-    """Thread for fetching detailed information about a NASA item."""
+def _parse_body(body, content_type, allow_text):
+    """Decode a detail response: JSON, or {"raw": text} for non-JSON bodies when allowed."""
+    if allow_text and not content_type.startswith("application/json"):
+        return {"raw": body.decode("utf-8", "replace")}
+    return json.loads(body)
+
 
-    def __init__(self, nasa_id, is_video, on_asset, on_metadata, on_captions):
-        super().__init__(daemon=True)
+def _merge_location(result, followed):
+    """Combine a {"location": url} pointer with the document it points to."""
+    merged = dict(followed) if isinstance(followed, dict) else {"text": followed}
+    merged.update(result)  # Keep "location" itself: the UI opens it in the browser
+    return merged
+
+
+class DetailFetcher:
+    """Fetches the asset manifest, metadata and captions of a NASA item on the I/O loop."""
+
+    # Endpoints answering with {"location": url} of the actual document
+    FOLLOW_LOCATION = ("metadata", "captions")
+
+    def __init__(self, nasa_id, is_video, on_asset, on_metadata, on_captions, on_complete=None,
+                 detail_cache=None, token=None, async_core=None):
+        self.token = token or CancelToken()  # Once cancelled, no further requests or callbacks
+        self.core = async_core or get_async_core()
+        self.cache = detail_cache or get_detail_cache()
+        self.base_url = API_BASE_URL
         self.nasa_id = nasa_id
         self.is_video = is_video
         self.on_asset = on_asset
         self.on_metadata = on_metadata
         self.on_captions = on_captions
+        self.on_complete = on_complete
+        self.timings = {}  # endpoint -> seconds, including the followed location
 
-    def run(self):
-        try:
-            r = requests.get(f"https://images-api.nasa.gov/asset/{self.nasa_id}", timeout=10)
-            self.on_asset(r.json() if r.ok else {})
-        except Exception:
-            self.on_asset({})
+    def _endpoints(self):
+        endpoints = [("asset", False, self.on_asset), ("metadata", True, self.on_metadata)]
+        if self.is_video:
+            endpoints.append(("captions", True, self.on_captions))
+        return endpoints
 
-        try:
-            r = requests.get(f"https://images-api.nasa.gov/metadata/{self.nasa_id}", timeout=10)
-            if r.ok:
-                if r.headers.get('Content-Type', '').startswith("application/json"):
-                    md = r.json()
-                else:
-                    md = {"raw": r.text}
-                self.on_metadata(md)
-            else:
-                self.on_metadata({})
-        except Exception:
-            self.on_metadata({})
+    async def _fetch_url(self, url, allow_text):
+        # Shared with other fetchers of the same URL; cancelled only once none of them waits
+        status, headers, body = await self.core.get(url)
+        if status >= 400:
+            return {}
+        return _parse_body(body, headers.get('Content-Type', ''), allow_text)
 
-        if self.is_video:
+    async def _get(self, endpoint, allow_text=False):
+        """Fetch an endpoint for this item and return its parsed body ({} on failure)."""
+        start = time.perf_counter()
+        result = await self.core.run_blocking(self.cache.get, self.nasa_id, endpoint)
+        if result is None:
             try:
-                r = requests.get(f"https://images-api.nasa.gov/captions/{self.nasa_id}", timeout=10)
-                self.on_captions(r.json() if r.ok else {})
+                result = await self._fetch_url(f"{self.base_url}/{endpoint}/{self.nasa_id}", allow_text)
+                location = result.get("location") if endpoint in self.FOLLOW_LOCATION else None
+                if isinstance(location, str) and location.startswith("http"):
+                    try:
+                        result = _merge_location(result, await self._fetch_url(location, True))
+                    except Exception as e:
+                        print(f"Could not follow {endpoint} location: {e}")
             except Exception:
-                self.on_captions({})
-        else:
-            self.on_captions({})
\ No newline at end of file
+                result = {}
+            if result:
+                await self.core.run_blocking(self.cache.put, self.nasa_id, endpoint, result)
+            else:
+                # Offline or failing: an expired copy beats an empty panel
+                result = await self.core.run_blocking(self.cache.get, self.nasa_id, endpoint, True) or {}
+        self.timings[endpoint] = time.perf_counter() - start
+        return result
+
+    async def fetch_asset_async(self):
+        """Coroutine fetching just the asset manifest (through the detail cache) without invoking callbacks."""
+        return await self._get("asset")
+
+    @property
+    def cancelled(self):
+        return self.token.cancelled
+
+    def cancel(self):
+        """Cancel the requests in flight; no callbacks are delivered afterwards."""
+        self.token.cancel()
+
+    async def _fetch_one(self, endpoint, allow_text, callback):
+        try:
+            result = await self._get(endpoint, allow_text)
+        except Exception:
+            result = {}
+        if callback and not self.cancelled:
+            post_result(callback, result)
+
+    async def fetch_async(self):
+        """Coroutine fetching every endpoint at once; each callback is posted as its own response lands."""
+        if not self.is_video and self.on_captions:
+            post_result(self.on_captions, {})
+        await asyncio.gather(*(self._fetch_one(*endpoint) for endpoint in self._endpoints()))
+        if self.on_complete and not self.cancelled:
+            post_result(self.on_complete, self.timings)
+
+    def start(self):
+        """Start fetching on the I/O loop and return the future; callbacks run on the pygame thread."""
+        return self.core.submit(self.fetch_async(), self.token)
@@ -0,0 +1,94 @@
+import re
+import json
+import codecs
+
+try:
+    import orjson
+    loads = orjson.loads
+    FAST_JSON_BACKEND = "orjson"
+except ImportError:
+    loads = json.loads
+    FAST_JSON_BACKEND = None
+
+_ITEMS_RE = re.compile(r'"items"\s*:\s*\[')
+_SEPARATOR_RE = re.compile(r'[\s,]*')
+_TOTAL_HITS_RE = re.compile(r'"total_hits"\s*:\s*(\d+)')
+
+
+class CollectionStreamParser:
+    """Incrementally extracts collection items from a streamed API response body."""
+
+    def __init__(self, head_size=400):
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._chunks = []  # Decoded text, joined once at the end for the response cache
+        self._text = ""  # Unconsumed text
+        self._pos = 0
+        self._state = "seek"  # seek -> items -> tail
+        self.head_size = head_size
+        self.head = ""  # First characters of the body, for the API log
+        self.items = []
+
+    def feed(self, chunk):
+        """Consume a chunk of bytes and return the items it completed."""
+        text = self._decoder.decode(chunk)
+        self._chunks.append(text)
+        if len(self.head) < self.head_size:
+            self.head = (self.head + text)[:self.head_size]
+        self._text += text
+        return self._scan()
+
+    def _scan(self):
+        found = []
+        if self._state == "seek":
+            m = _ITEMS_RE.search(self._text, self._pos)
+            if not m:
+                return found
+            self._pos = m.end()
+            self._state = "items"
+
+        while self._state == "items":
+            self._pos = _SEPARATOR_RE.match(self._text, self._pos).end()
+            if self._pos >= len(self._text):
+                break
+            if self._text[self._pos] == "]":
+                self._pos += 1
+                self._state = "tail"
+                break
+            try:
+                # Parse one whole item at C speed; incomplete data raises and waits for more bytes
+                item, self._pos = self._json.raw_decode(self._text, self._pos)
+            except ValueError:
+                break
+            found.append(item)
+
+        # Drop consumed text so the buffer only holds the item being received
+        if self._state == "items":
+            self._text = self._text[self._pos:]
+            self._pos = 0
+
+        self.items.extend(found)
+        return found
+
+    @property
+    def body(self):
+        return "".join(self._chunks)
+
+    def finish(self):
+        """Flush the stream; return (remaining items, total_hits)."""
+        tail = self._decoder.decode(b"", final=True)
+        if tail:
+            self._chunks.append(tail)
+            self._text += tail
+        remaining = self._scan()
+
+        if self._state != "tail":
+            # Unexpected layout: fall back to parsing the whole body
+            collection = loads(self.body).get("collection", {})
+            all_items = collection.get("items", [])
+            remaining += all_items[len(self.items):]
+            self.items = all_items
+            return remaining, collection.get("metadata", {}).get("total_hits")
+
+        m = _TOTAL_HITS_RE.search(self._text, self._pos)
+        return remaining, int(m.group(1)) if m else None
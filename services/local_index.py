@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+from app.config import CACHE_DIR
+from services.search_result import SearchResult, PARSED_FIELDS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    nasa_id TEXT PRIMARY KEY,
+    title TEXT,
+    description TEXT,
+    keywords TEXT,
+    center TEXT,
+    date TEXT,
+    media_type TEXT,
+    preview_href TEXT,
+    extra TEXT,
+    seen_at REAL
+);
+CREATE INDEX IF NOT EXISTS results_media_type ON results(media_type);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS results_fts USING fts5(
+    title, description, keywords, center, date, content='results', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS results_ai AFTER INSERT ON results BEGIN
+    INSERT INTO results_fts(rowid, title, description, keywords, center, date)
+    VALUES (new.rowid, new.title, new.description, new.keywords, new.center, new.date);
+END;
+CREATE TRIGGER IF NOT EXISTS results_ad AFTER DELETE ON results BEGIN
+    INSERT INTO results_fts(results_fts, rowid, title, description, keywords, center, date)
+    VALUES ('delete', old.rowid, old.title, old.description, old.keywords, old.center, old.date);
+END;
+CREATE TRIGGER IF NOT EXISTS results_au AFTER UPDATE ON results BEGIN
+    INSERT INTO results_fts(results_fts, rowid, title, description, keywords, center, date)
+    VALUES ('delete', old.rowid, old.title, old.description, old.keywords, old.center, old.date);
+    INSERT INTO results_fts(rowid, title, description, keywords, center, date)
+    VALUES (new.rowid, new.title, new.description, new.keywords, new.center, new.date);
+END;
+"""
+
+_UPSERT = """
+INSERT INTO results (nasa_id, title, description, keywords, center, date, media_type, preview_href, extra, seen_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(nasa_id) DO UPDATE SET
+    title = excluded.title, description = excluded.description, keywords = excluded.keywords,
+    center = excluded.center, date = excluded.date, media_type = excluded.media_type,
+    preview_href = excluded.preview_href, extra = excluded.extra, seen_at = excluded.seen_at
+"""
+
+_COLUMNS = "r.nasa_id, r.title, r.center, r.date, r.media_type, r.preview_href, r.keywords"
+
+
+class LocalIndex:
+    """Embedded full-text index (SQLite FTS5) of every search result seen."""
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(CACHE_DIR, "index.sqlite3")
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        try:
+            self.conn.executescript(_FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: fall back to LIKE matching
+            self.fts = False
+        self.conn.commit()
+
+    def add_many(self, items):
+        """Insert or refresh raw collection items in the index, keeping every data field."""
+        now = time.time()
+        rows = []
+        for item in items:
+            r = SearchResult.from_item(item)
+            if not r.nasa_id:
+                continue
+            d = (item.get("data") or [{}])[0]
+            # The gallery record drops these; the detail view reads them back with details()
+            extra = {k: v for k, v in d.items() if k not in PARSED_FIELDS and k != "description"}
+            rows.append((r.nasa_id, r.title, d.get("description") or "", "; ".join(r.keywords), r.center, r.date,
+                         r.media_type, r.preview_href, json.dumps(extra) if extra else None, now))
+        if not rows:
+            return
+        with self.lock:
+            try:
+                self.conn.executemany(_UPSERT, rows)
+                self.conn.commit()
+            except sqlite3.Error as e:
+                print(f"Local index write failed: {e}")
+
+    def search(self, query, media_type=None, limit=200):
+        """Return SearchResults matching query, best matches first."""
+        terms = [t for t in query.split() if t]
+        if not terms:
+            return []
+
+        type_clause = ""
+        args = []
+        if media_type and media_type not in ("all", "album"):
+            type_clause = " AND r.media_type = ?"
+            args.append(media_type)
+
+        if self.fts:
+            # Quote every term so user input cannot inject FTS syntax; prefix-match the words
+            match = " ".join('"' + t.replace('"', '""') + '"*' for t in terms)
+            sql = (f"SELECT {_COLUMNS} FROM results_fts JOIN results r ON r.rowid = results_fts.rowid "
+                   f"WHERE results_fts MATCH ?{type_clause} ORDER BY bm25(results_fts) LIMIT ?")
+            args = [match] + args + [limit]
+        else:
+            like = " AND ".join("(r.title LIKE ? OR r.description LIKE ? OR r.keywords LIKE ?)" for _ in terms)
+            sql = f"SELECT {_COLUMNS} FROM results r WHERE {like}{type_clause} ORDER BY r.seen_at DESC LIMIT ?"
+            like_args = []
+            for t in terms:
+                like_args += [f"%{t}%"] * 3
+            args = like_args + args + [limit]
+
+        with self.lock:
+            try:
+                rows = self.conn.execute(sql, args).fetchall()
+            except sqlite3.Error as e:
+                print(f"Local index query failed: {e}")
+                return []
+
+        return [self._to_result(row) for row in rows]
+
+    @staticmethod
+    def _to_result(row):
+        nasa_id, title, center, date, media_type, preview_href, keywords = row
+        return SearchResult(nasa_id, title, center or "", date or "", media_type or "", preview_href,
+                            tuple(keywords.split("; ")) if keywords else ())
+
+    def details(self, nasa_id):
+        """Return the data fields a SearchResult does not keep (description, photographer, ...), or {}."""
+        with self.lock:
+            try:
+                row = self.conn.execute("SELECT description, extra FROM results WHERE nasa_id = ?",
+                                        (nasa_id,)).fetchone()
+            except sqlite3.Error as e:
+                print(f"Local index query failed: {e}")
+                return {}
+        if row is None:
+            return {}
+        description, extra = row
+        details = json.loads(extra) if extra else {}
+        if description:
+            details["description"] = description
+        return details
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,181 @@
+import time
+import weakref
+import threading
+import pygame
+
+from app.config import MEMORY_BUDGET_BYTES, MEMORY_LOW_WATERMARK, MEMORY_POLL_INTERVAL
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+def surface_bytes(surf):
+    """Approximate memory held by a cached value (pixel data for surfaces)."""
+    if isinstance(surf, pygame.Surface):
+        return surf.get_width() * surf.get_height() * surf.get_bytesize()
+    nbytes = getattr(surf, "nbytes", None)  # numpy arrays, memoryviews
+    if nbytes is not None:
+        return nbytes
+    try:
+        return len(surf)
+    except TypeError:
+        return 0
+
+
+def available_memory():
+    """Bytes of RAM the OS reports as available, or None if unknown."""
+    if PSUTIL_AVAILABLE:
+        return psutil.virtual_memory().available
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class _Tracked:
+    """Adapter for memory that is reported but not evicted entry by entry (e.g. screen state)."""
+
+    def __init__(self, name, usage, release=None):
+        self.name = name
+        self.usage = usage
+        self.release = release
+
+    def memory_bytes(self):
+        return self.usage()
+
+    def memory_oldest(self):
+        return None
+
+    def memory_evict(self):
+        return 0
+
+    def memory_release(self):
+        if self.release:
+            self.release()
+
+
+class MemoryGovernor:
+    """Keeps the combined size of all registered caches within one global byte budget.
+
+    A participant provides memory_bytes(), memory_oldest() (monotonic last-use time of its
+    least recently used evictable entry, or None) and memory_evict() (drop that entry,
+    return bytes freed); memory_release() is optional and called under low-memory pressure.
+    """
+
+    def __init__(self, budget=MEMORY_BUDGET_BYTES, low_watermark=MEMORY_LOW_WATERMARK,
+                 poll_interval=MEMORY_POLL_INTERVAL):
+        self.budget = budget
+        self.low_watermark = low_watermark
+        self.poll_interval = poll_interval
+        self.participants = []  # (weakref to participant, weight)
+        self.lock = threading.RLock()
+        self.evictions = 0
+        self.low_memory_events = 0
+        self.monitor = None
+
+    def register(self, participant, weight=1.0):
+        """Track participant; a higher weight makes its old entries go sooner."""
+        with self.lock:
+            self.participants.append((weakref.ref(participant), weight))
+        return participant
+
+    def track(self, name, usage, release=None, weight=1.0):
+        """Track memory reported by usage(); release() is called when the system runs low."""
+        tracked = _Tracked(name, usage, release)
+        with self.lock:
+            # Held strongly: the adapter has no other owner
+            self.participants.append((lambda t=tracked: t, weight))
+        return tracked
+
+    def _live(self):
+        """(participant, weight) pairs still alive; forgets collected ones."""
+        live = []
+        kept = []
+        for entry in self.participants:
+            p = entry[0]()
+            if p is not None:
+                live.append((p, entry[1]))
+                kept.append(entry)
+        self.participants = kept
+        return live
+
+    def usage(self):
+        """Bytes held per participant name."""
+        with self.lock:
+            result = {}
+            for p, _ in self._live():
+                name = getattr(p, "name", type(p).__name__)
+                result[name] = result.get(name, 0) + p.memory_bytes()
+            return result
+
+    def total(self):
+        with self.lock:
+            return sum(p.memory_bytes() for p, _ in self._live())
+
+    def enforce(self, budget=None):
+        """Evict across participants until the total fits budget; the stalest weighted entry goes first."""
+        budget = self.budget if budget is None else budget
+        with self.lock:
+            live = self._live()
+            total = sum(p.memory_bytes() for p, _ in live)
+            while total > budget:
+                now = time.monotonic()
+                victim = None
+                best = -1.0
+                for p, weight in live:
+                    oldest = p.memory_oldest()
+                    if oldest is not None and (now - oldest) * weight > best:
+                        victim, best = p, (now - oldest) * weight
+                if victim is None:
+                    break  # Only non-evictable memory left
+                freed = victim.memory_evict()
+                self.evictions += 1
+                total -= freed
+
+    def on_low_memory(self):
+        """Shrink to half the budget and ask tracked state to release what it can rebuild."""
+        self.low_memory_events += 1
+        print("Low memory: trimming media caches")
+        with self.lock:
+            for p, _ in self._live():
+                release = getattr(p, "memory_release", None)
+                if release:
+                    release()
+        self.enforce(self.budget // 2)
+
+    def start_monitor(self):
+        """Poll available system memory in the background and trim caches when it runs low."""
+        if self.monitor is None and self.low_watermark and available_memory() is not None:
+            self.monitor = threading.Thread(target=self._monitor, daemon=True)
+            self.monitor.start()
+
+    def _monitor(self):
+        while True:
+            time.sleep(self.poll_interval)
+            available = available_memory()
+            if available is not None and available < self.low_watermark:
+                self.on_low_memory()
+
+    def stats(self):
+        return {"total": self.total(), "budget": self.budget, "evictions": self.evictions,
+                "low_memory_events": self.low_memory_events}
+
+
+_shared_governor = None
+_shared_lock = threading.Lock()
+
+
+def get_memory_governor():
+    """Return the process-wide memory governor."""
+    global _shared_governor
+    with _shared_lock:
+        if _shared_governor is None:
+            _shared_governor = MemoryGovernor()
+        return _shared_governor
@@ -0,0 +1,126 @@
+import threading
+import pygame
+
+from services.cancellation import CancelToken
+
+# NASA rendition suffixes from smallest to largest
+RENDITIONS = ("~thumb", "~small", "~medium", "~large", "~orig")
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp')
+
+
+def rendition_rank(url):
+    """Position of url's rendition in RENDITIONS; unknown names count as originals."""
+    name = url.rsplit("/", 1)[-1].lower()
+    for rank, suffix in enumerate(RENDITIONS):
+        if suffix + "." in name:
+            return rank
+    return len(RENDITIONS) - 1
+
+
+def rendition_chain(target_url, hrefs):
+    """Image renditions to load on the way to target_url, smallest first, ending with target_url."""
+    target_rank = rendition_rank(target_url)
+    by_rank = {}
+    for href in hrefs:
+        if href != target_url and href.lower().endswith(IMAGE_EXTENSIONS):
+            rank = rendition_rank(href)
+            # ~thumb is already shown as the gallery placeholder
+            if 0 < rank < target_rank:
+                by_rank.setdefault(rank, href)
+    return [by_rank[rank] for rank in sorted(by_rank)] + [target_url]
+
+
+class ProgressiveImage:
+    """Loads an image rendition by rendition, always exposing the best one decoded so far."""
+
+    def __init__(self, image_service, target_url, hrefs=(), placeholder=None):
+        self.image_service = image_service
+        self.target_url = target_url
+        self.chain = rendition_chain(target_url, hrefs)
+        # The original is only worth its download once zoom needs more pixels than ~large has
+        self.lazy_target = len(self.chain) > 1 and rendition_rank(target_url) == len(RENDITIONS) - 1
+        self.surface = placeholder
+        self.surface_url = None
+        self.level = -1  # Index in chain of the rendition in self.surface
+        self.failed = False
+        self.token = CancelToken()  # Aborts the rendition download in flight on cancel()
+        self.full_requested = not self.lazy_target
+        self.lock = threading.Lock()
+        self.thread = None
+
+        # Start from the best rendition already decoded
+        for level in range(len(self.chain) - 1, -1, -1):
+            cached = self.image_service.preview_cache.get(self.chain[level])
+            if cached:
+                self._set(level, cached)
+                break
+
+    @property
+    def final(self):
+        """Whether the target rendition itself is shown."""
+        return self.level == len(self.chain) - 1
+
+    @property
+    def loading(self):
+        return self.thread is not None
+
+    def _set(self, level, surface):
+        self.surface = surface
+        self.surface_url = self.chain[level]
+        self.level = level
+
+    def start(self):
+        """Load the remaining renditions in the background."""
+        with self.lock:
+            if self.thread is not None or self.cancelled or self.level + 1 >= self._last():
+                return
+            self.thread = threading.Thread(target=self._run, args=(self.level + 1,), daemon=True)
+            self.thread.start()
+
+    def request_full(self):
+        """Fetch the target rendition too (e.g. because the user zoomed in)."""
+        if not self.full_requested:
+            with self.lock:
+                self.full_requested = True
+            self.start()
+
+    def maybe_request_full(self, scale):
+        """Fetch the target once the best smaller rendition is drawn above its native size."""
+        if not self.full_requested and scale > 1.0 and self.level == len(self.chain) - 2:
+            self.request_full()
+
+    @property
+    def cancelled(self):
+        return self.token.cancelled
+
+    def cancel(self):
+        self.token.cancel()
+
+    def _last(self):
+        return len(self.chain) if self.full_requested else len(self.chain) - 1
+
+    def _run(self, level):
+        while True:
+            with self.lock:
+                # Decided under the lock so a concurrent request_full() is never lost
+                if self.cancelled or level >= self._last():
+                    self.thread = None
+                    return
+            url = self.chain[level]
+            try:
+                surf = self.image_service.fetch_preview_surface(url, self.token)
+            except Exception as e:
+                if self.cancelled:
+                    continue  # Exits at the top of the loop
+                print(f"Error loading rendition {url}: {e}")
+                with self.lock:
+                    if level == len(self.chain) - 1:
+                        self.failed = True
+                    elif level == len(self.chain) - 2 and self.level < 0:
+                        self.full_requested = True  # No smaller rendition worked: fall back to the target
+                level += 1
+                continue
+            if not self.cancelled:
+                self._set(level, surf)
+                pygame.event.post(pygame.event.Event(pygame.USEREVENT, {}))
+            level += 1
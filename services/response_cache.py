@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+from app.config import CACHE_DIR, RESPONSE_CACHE_TTL, RESPONSE_CACHE_STALE_TTL, RESPONSE_CACHE_MAX_BYTES
+
+
+class CacheEntry:
+    """A cached API response together with its validators."""
+
+    def __init__(self, url, status, body, etag=None, last_modified=None, stored_at=None):
+        self.url = url
+        self.status = status
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at if stored_at is not None else time.time()
+
+    def age(self):
+        return time.time() - self.stored_at
+
+    def to_dict(self):
+        return {
+            "url": self.url,
+            "status": self.status,
+            "body": self.body,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "stored_at": self.stored_at
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["url"], d["status"], d["body"], d.get("etag"), d.get("last_modified"), d.get("stored_at"))
+
+
+class ResponseCache:
+    """Persistent on-disk cache of API responses keyed by endpoint and params."""
+
+    def __init__(self, cache_dir=None, ttl=RESPONSE_CACHE_TTL, stale_ttl=RESPONSE_CACHE_STALE_TTL,
+                 max_bytes=RESPONSE_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir or os.path.join(CACHE_DIR, "responses")
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(endpoint, params):
+        """Build a stable key from an endpoint and its normalized params."""
+        normalized = {str(k): str(v).strip().lower() if k == "q" else str(v)
+                      for k, v in (params or {}).items() if v is not None and v != ""}
+        raw = endpoint + "?" + json.dumps(normalized, sort_keys=True)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def get(self, key):
+        """Return the cached entry for key, or None."""
+        path = self._path(key)
+        with self.lock:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = CacheEntry.from_dict(json.load(f))
+                os.utime(path)  # Mark as recently used for eviction
+                return entry
+            except (OSError, ValueError, KeyError):
+                return None
+
+    def is_fresh(self, entry):
+        return entry.age() < self.ttl
+
+    def is_usable(self, entry):
+        """Whether a stale entry may still be shown while it is revalidated."""
+        return entry.age() < self.ttl + self.stale_ttl
+
+    def put(self, key, entry):
+        """Store an entry and evict old ones if the size cap is exceeded."""
+        path = self._path(key)
+        tmp_path = path + ".tmp"
+        with self.lock:
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(entry.to_dict(), f)
+                os.replace(tmp_path, path)
+            except OSError:
+                return
+            self._evict()
+
+    def touch(self, key):
+        """Reset the age of an entry after a successful revalidation."""
+        entry = self.get(key)
+        if entry:
+            entry.stored_at = time.time()
+            self.put(key, entry)
+        return entry
+
+    def _evict(self):
+        """Remove least recently used entries until the cache fits its cap."""
+        try:
+            files = []
+            total = 0
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".json"):
+                    continue
+                st = os.stat(os.path.join(self.cache_dir, name))
+                files.append((st.st_mtime, st.st_size, name))
+                total += st.st_size
+        except OSError:
+            return
+
+        if total <= self.max_bytes:
+            return
+
+        files.sort()
+        for _, size, name in files:
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        """Remove every cached response."""
+        with self.lock:
+            for name in os.listdir(self.cache_dir):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
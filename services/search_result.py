@@ -0,0 +1,64 @@
+import sys
+
+# data fields held in dedicated slots; the rest (description, photographer, ...) live in the local index
+PARSED_FIELDS = ("nasa_id", "title", "center", "media_type", "keywords")
+
+
+class SearchResult:
+    """Compact record of one search result: only what the gallery draws, searches and sorts by."""
+
+    __slots__ = ("nasa_id", "title", "center", "date", "media_type", "preview_href", "keywords", "meta")
+
+    def __init__(self, nasa_id, title, center="", date="", media_type="", preview_href=None, keywords=()):
+        self.nasa_id = nasa_id
+        self.title = title
+        # Centers, media types and keywords repeat across thousands of results
+        self.center = sys.intern(center)
+        self.date = date
+        self.media_type = sys.intern(media_type)
+        self.preview_href = preview_href
+        self.keywords = keywords
+        self.meta = f"{self.center} {date}"  # Gallery caption line
+
+    @classmethod
+    def from_item(cls, item):
+        """Parse a raw collection item ({"data": [...], "links": [...]})."""
+        d = (item.get("data") or [{}])[0]
+
+        preview_href = None
+        for link in item.get("links", []):
+            if link.get("rel") == "preview" and "href" in link:
+                preview_href = link["href"]
+                break
+
+        keywords = tuple(sys.intern(k) for k in d.get("keywords", []) if isinstance(k, str))
+
+        return cls(
+            d.get("nasa_id", ""),
+            d.get("title", "No title"),
+            d.get("center", ""),
+            d.get("date_created", "")[:10],
+            d.get("media_type", ""),
+            preview_href,
+            keywords
+        )
+
+    def to_item(self, details=None):
+        """Rebuild a raw collection item for consumers that expect the API's dict layout.
+
+        details holds the remaining data fields (from LocalIndex.details) when the caller has them.
+        """
+        d = dict(details) if details else {}
+        d["nasa_id"] = self.nasa_id
+        d["title"] = self.title
+        if self.center:
+            d["center"] = self.center
+        if self.date and "date_created" not in d:
+            d["date_created"] = self.date
+        if self.media_type:
+            d["media_type"] = self.media_type
+        if self.keywords:
+            d["keywords"] = list(self.keywords)
+
+        links = [{"rel": "preview", "href": self.preview_href}] if self.preview_href else []
+        return {"data": [d], "links": links}
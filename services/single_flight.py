@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import weakref
+
+from services.cancellation import CancelledError
+
+
+class _Call:
+    """A request in flight whose result is shared by every caller of the same key."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into a single execution."""
+
+    _instances = weakref.WeakSet()
+
+    def __init__(self, name=""):
+        self.name = name
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.requests = 0
+        self.deduplicated = 0
+        SingleFlight._instances.add(self)
+
+    def do(self, key, fn):
+        """Run fn for key, or wait for the identical call already in flight and share its result."""
+        while True:
+            with self.lock:
+                self.requests += 1
+                call = self.calls.get(key)
+                leader = call is None
+                if leader:
+                    call = _Call()
+                    self.calls[key] = call
+                else:
+                    self.deduplicated += 1
+
+            if leader:
+                try:
+                    call.result = fn()
+                except BaseException as e:
+                    call.error = e
+                finally:
+                    with self.lock:
+                        del self.calls[key]
+                    call.done.set()
+                if call.error is not None:
+                    raise call.error
+                return call.result
+
+            call.done.wait()
+            if isinstance(call.error, CancelledError):
+                # The leader gave up on its own behalf; this caller still wants the result
+                with self.lock:
+                    self.deduplicated -= 1
+                    self.requests -= 1
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+    def stats(self):
+        with self.lock:
+            return {"requests": self.requests, "deduplicated": self.deduplicated, "in_flight": len(self.calls)}
+
+
+class AsyncSingleFlight:
+    """asyncio counterpart of SingleFlight; use from a single event loop."""
+
+    def __init__(self, name=""):
+        self.name = name
+        self.tasks = {}
+        self.waiters = {}  # task -> number of callers awaiting it
+        self.requests = 0
+        self.deduplicated = 0
+        SingleFlight._instances.add(self)
+
+    def _forget(self, key, task):
+        if self.tasks.get(key) is task:
+            del self.tasks[key]
+
+    async def do(self, key, coro_fn):
+        """Await coro_fn() for key, or the identical task already in flight."""
+        self.requests += 1
+        task = self.tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(coro_fn())
+            self.tasks[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            self.deduplicated += 1
+        self.waiters[task] = self.waiters.get(task, 0) + 1
+        try:
+            # Shield so one waiter being cancelled does not cancel the shared request
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self.waiters[task] == 1 and not task.done():
+                # Nobody else wants the result: stop the request instead of finishing it unseen
+                self._forget(key, task)
+                task.cancel()
+            raise
+        finally:
+            self.waiters[task] -= 1
+            if not self.waiters[task]:
+                del self.waiters[task]
+
+    def stats(self):
+        return {"requests": self.requests, "deduplicated": self.deduplicated, "in_flight": len(self.tasks)}
+
+
+def total_deduplicated():
+    """Number of requests deduplicated across every SingleFlight in the process."""
+    return sum(flight.deduplicated for flight in list(SingleFlight._instances))
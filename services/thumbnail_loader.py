@@ -0,0 +1,81 @@
+import heapq
+import itertools
+import threading
+import pygame
+
+from app.config import THUMB_LOADER_WORKERS
+
+# Priorities: lower is fetched first
+PRIORITY_VISIBLE = 0
+PRIORITY_PREFETCH = 1
+
+
+class ThumbnailLoader:
+    """Fetches gallery thumbnails as coroutines on the I/O loop, visible ones first, a few at a time."""
+
+    def __init__(self, image_service, thumb_size=110, workers=THUMB_LOADER_WORKERS):
+        self.image_service = image_service
+        self.core = image_service.core
+        self.thumb_size = thumb_size
+        self.workers = workers  # Fetches in flight at once
+        self.lock = threading.Lock()
+        self.heap = []  # (priority, seq, url)
+        self.pending = {}  # url -> (priority, seq) of its live heap entry
+        self.active = set()  # URLs being fetched right now
+        self.tasks = set()  # Their tasks, kept referenced until done
+        self.seq = itertools.count()
+        self.closed = False
+        self.completed = 0
+        self.dropped = 0
+
+    def schedule(self, visible, prefetch=()):
+        """Replace the queue: fetch visible URLs first, then prefetch; drop everything else."""
+        with self.lock:
+            wanted = {}
+            for priority, urls in ((PRIORITY_VISIBLE, visible), (PRIORITY_PREFETCH, prefetch)):
+                for url in urls:
+                    if url and url not in wanted and url not in self.active:
+                        wanted[url] = (priority, next(self.seq))
+
+            # Work for results that are no longer displayed is cancelled before it starts
+            self.dropped += sum(1 for url in self.pending if url not in wanted)
+            self.pending = wanted
+            self.heap = [(priority, seq, url) for url, (priority, seq) in wanted.items()]
+            heapq.heapify(self.heap)
+        self.core.loop.call_soon_threadsafe(self._pump)
+
+    def cancel(self):
+        """Drop all queued work; fetches already running finish into the cache."""
+        self.schedule(())
+
+    def _pump(self):
+        """Start queued fetches up to the concurrency limit; runs on the I/O loop."""
+        with self.lock:
+            while not self.closed and self.heap and len(self.active) < self.workers:
+                priority, seq, url = heapq.heappop(self.heap)
+                if self.pending.get(url) == (priority, seq):
+                    del self.pending[url]
+                    self.active.add(url)
+                    task = self.core.loop.create_task(self._load(url))
+                    self.tasks.add(task)
+                    task.add_done_callback(self.tasks.discard)
+
+    async def _load(self, url):
+        try:
+            await self.image_service.fetch_image_surface_async(url, self.thumb_size)
+        finally:
+            with self.lock:
+                self.active.discard(url)
+                self.completed += 1
+            pygame.event.post(pygame.event.Event(pygame.USEREVENT, {}))
+            self._pump()
+
+    def queued(self):
+        with self.lock:
+            return len(self.pending)
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.pending.clear()
+            self.heap.clear()
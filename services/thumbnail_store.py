@@ -0,0 +1,145 @@
+import os
+import time
+import struct
+import hashlib
+import threading
+
+from app.config import CACHE_DIR, THUMB_STORE_MAX_BYTES, THUMB_STORE_NEGATIVE_TTL
+
+# magic, width, height, mode (padded to 4 bytes); raw pixel rows follow
+_HEADER = struct.Struct("<4sHH4s")
+_MAGIC = b"NTH1"
+
+
+class ThumbnailStore:
+    """Persistent on-disk store of decoded, pre-scaled thumbnail pixels keyed by URL and size."""
+
+    def __init__(self, cache_dir=None, max_bytes=THUMB_STORE_MAX_BYTES, negative_ttl=THUMB_STORE_NEGATIVE_TTL):
+        self.cache_dir = cache_dir or os.path.join(CACHE_DIR, "thumbs")
+        self.max_bytes = max_bytes
+        self.negative_ttl = negative_ttl
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.total_bytes = self._scan_size()
+
+    @staticmethod
+    def make_key(url, size):
+        return hashlib.sha1(f"{url}|{size}".encode("utf-8")).hexdigest()
+
+    def _path(self, key, ext=".px"):
+        # Two-level fan-out keeps directories small on kiosks with large caches
+        return os.path.join(self.cache_dir, key[:2], key + ext)
+
+    def _scan_size(self):
+        total = 0
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith(".px"):
+                    try:
+                        total += os.path.getsize(os.path.join(root, name))
+                    except OSError:
+                        pass
+        return total
+
+    def get(self, url, size):
+        """Return (mode, (width, height), pixels) for a stored thumbnail, or None."""
+        path = self._path(self.make_key(url, size))
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            magic, width, height, mode = _HEADER.unpack_from(data)
+            mode = mode.rstrip(b" ").decode("ascii")
+            if magic != _MAGIC or len(data) - _HEADER.size != width * height * len(mode):
+                raise ValueError("corrupt thumbnail")
+            os.utime(path)  # Mark as recently used for eviction
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, struct.error):
+            self.misses += 1
+            self._remove(path)
+            return None
+        self.hits += 1
+        return mode, (width, height), memoryview(data)[_HEADER.size:]
+
+    def put(self, url, size, mode, dimensions, pixels):
+        """Store decoded pixels and evict least recently used thumbnails over the size cap."""
+        path = self._path(self.make_key(url, size))
+        tmp_path = path + ".tmp"
+        header = _HEADER.pack(_MAGIC, dimensions[0], dimensions[1], mode.ljust(4).encode("ascii"))
+        with self.lock:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                old_size = os.path.getsize(path) if os.path.exists(path) else 0
+                with open(tmp_path, "wb") as f:
+                    f.write(header)
+                    f.write(pixels)
+                os.replace(tmp_path, path)
+            except OSError:
+                return
+            self.total_bytes += len(header) + len(pixels) - old_size
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def mark_failed(self, url, size):
+        """Remember that url cannot be turned into a thumbnail, so it is not retried for a while."""
+        path = self._path(self.make_key(url, size), ".neg")
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb"):
+                pass
+        except OSError:
+            pass
+
+    def is_failed(self, url, size):
+        """Whether url failed recently (negative cache)."""
+        path = self._path(self.make_key(url, size), ".neg")
+        try:
+            if time.time() - os.path.getmtime(path) < self.negative_ttl:
+                return True
+        except OSError:
+            return False
+        self._remove(path)
+        return False
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Remove least recently used thumbnails until the store is 90% of its cap."""
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if name.endswith(".px"):
+                    files.append((st.st_mtime, st.st_size, path))
+                elif name.endswith(".neg") and time.time() - st.st_mtime >= self.negative_ttl:
+                    self._remove(path)
+
+        # Trim below the cap so a full store does not rescan on every put
+        target = self.max_bytes * 0.9
+        total = sum(size for _, size, _ in files)
+        files.sort()
+        for _, size, path in files:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+        self.total_bytes = total
+
+    def clear(self):
+        """Remove every stored thumbnail and negative entry."""
+        with self.lock:
+            for root, _, names in os.walk(self.cache_dir):
+                for name in names:
+                    self._remove(os.path.join(root, name))
+            self.total_bytes = 0
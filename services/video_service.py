@@ -2,13 +2,14 @@ import os
 import time
 import tempfile
 import threading
-import requests
 import vlc
 import pygame
 import numpy as np
 import cv2
 from PIL import Image
 import ctypes  # Przeniesione na początek pliku
+from services.http_client import get_http_client
+from services.memory_governor import get_memory_governor, surface_bytes
 
 class VideoCache:
     """Cache for storing video thumbnails and files."""
@@ -17,6 +18,20 @@ class VideoCache:
         self.file_cache = {}  # For video files (url -> path)
         self.max_size = max_size
         self.temp_dir = tempfile.mkdtemp()
+        self.name = "video thumbnails"
+        get_memory_governor().register(self)
+    def memory_bytes(self):
+        return sum(surface_bytes(thumb) for _, thumb in list(self.cache.values()))
+    def memory_oldest(self):
+        entries = list(self.cache.values())
+        # Stored times are wall-clock; convert to the governor's monotonic clock
+        return time.monotonic() - (time.time() - min(t for t, _ in entries)) if entries else None
+    def memory_evict(self):
+        try:
+            oldest_url = min(self.cache.items(), key=lambda x: x[1][0])[0]
+            return surface_bytes(self.cache.pop(oldest_url)[1])
+        except (ValueError, KeyError):
+            return 0
     def get(self, url):
         if url in self.cache:
             self.cache[url] = (time.time(), self.cache[url][1])
@@ -27,6 +42,7 @@ class VideoCache:
             oldest_url = min(self.cache.items(), key=lambda x: x[1][0])[0]
             del self.cache[oldest_url]
         self.cache[url] = (time.time(), thumbnail)
+        get_memory_governor().enforce()
     def get_file(self, url):
         if url in self.file_cache:
             self.file_cache[url] = (time.time(), self.file_cache[url][1])
@@ -61,7 +77,8 @@ vlc_args = [
 
 class VideoPlayer:
     """VLC-backed in-memory video player for Pygame overlays."""
-    def __init__(self, size=(640, 360)):
+    def __init__(self, size=(640, 360), http_client=None):
+        self.http = http_client or get_http_client()
         self.size = size  # (width, height)
         self.width, self.height = self.size
         self.temp_dir = tempfile.mkdtemp()
@@ -70,6 +87,10 @@ class VideoPlayer:
         self._frame = np.zeros((self.height, self.width, 4), dtype=np.uint8)
         self._vlc_frame = self._frame.ctypes.data
         self._frame_lock = threading.Lock()
+        get_memory_governor().track("video frame buffer",
+                                    lambda: self._frame.nbytes + surface_bytes(self._surface))
+        self.frame_version = 0  # Bumped by VLC for every decoded frame
+        self._surface_version = -1  # frame_version last copied into _surface
         self.is_playing = False
         self.is_paused = False
         self.position = 0.0
@@ -116,6 +137,7 @@ class VideoPlayer:
         @display_cb
         def _display(cb_data, picture):
             try:
+                self.frame_version += 1
                 self._video_ready.set()
             except Exception as e:
                 print(f"Błąd w callback display: {e}")
@@ -147,7 +169,7 @@ class VideoPlayer:
                 file_path = os.path.join(self.temp_dir, os.path.basename(url).replace("~", "_"))
                 if not os.path.exists(file_path):
                     try:
-                        with requests.get(url, stream=True, timeout=10) as r:
+                        with self.http.get(url, stream=True, timeout=10) as r:
                             if r.status_code != 200:
                                 print(f"Błąd pobierania wideo: Status {r.status_code}")
                                 return False
@@ -212,8 +234,12 @@ class VideoPlayer:
         if not self.is_playing:
             return self._surface
 
+        if self._surface_version == self.frame_version:
+            return self._surface  # No new frame since the last call
+
         try:
             with self._frame_lock:
+                self._surface_version = self.frame_version
                 # Sprawdź czy bufor jest prawidłowy przed użyciem
                 if self._frame is not None and self._frame.size > 0:
                     # Sprawdź poprawność wymiarów tablicy przed użyciem
@@ -268,18 +294,32 @@ class VideoPlayer:
     def get_buffered(self):
         return 1.0 if self.is_playing else 0.0
 
-    def get_thumbnail(self, url, size=(320, 240)):
+    def get_thumbnail(self, url, size=(320, 240), token=None):
+        """Thumbnail from the first seconds of a video; None if token is cancelled before it is ready."""
         cached_thumb = self.video_cache.get(url)
         if cached_thumb:
             return cached_thumb
         try:
             temp_file = os.path.join(self.temp_dir, f"thumb_{os.path.basename(url)}")
-            response = requests.get(url, stream=True)
-            with open(temp_file, 'wb') as f:
-                for i, chunk in enumerate(response.iter_content(chunk_size=1024*1024)):
-                    if chunk:
-                        f.write(chunk)
-                    if i > 2: break
+            response = self.http.get(url, stream=True)
+            if token is not None:
+                token.register(response)  # Cancelling closes the connection mid-chunk
+            try:
+                with open(temp_file, 'wb') as f:
+                    for i, chunk in enumerate(response.iter_content(chunk_size=1024*1024)):
+                        if chunk:
+                            f.write(chunk)
+                        if i > 2: break
+            except Exception:
+                if token is None or not token.cancelled:
+                    raise
+            finally:
+                if token is not None:
+                    token.unregister(response)
+            if token is not None and token.cancelled:
+                response.close()
+                os.remove(temp_file)
+                return None
             cap = cv2.VideoCapture(temp_file)
             cap.set(cv2.CAP_PROP_POS_MSEC, 5000)
             success, frame = cap.read()
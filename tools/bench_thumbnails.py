@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark the thumbnail decoders in services/image_decode.py.
+
+Usage:
+    python -m tools.bench_thumbnails [image files or directories] [--size 110] [--repeat 5]
+
+Without paths a few synthetic JPEGs of typical NASA preview and original sizes are used.
+"""
+
+import os
+import io
+import sys
+import time
+import argparse
+
+from PIL import Image
+
+from services.image_decode import DECODERS, TURBOJPEG_AVAILABLE
+
+
+def synthetic_samples():
+    samples = []
+    for w, h in ((320, 240), (1280, 960), (4000, 3000)):
+        img = Image.radial_gradient("L").resize((w, h)).convert("RGB")
+        out = io.BytesIO()
+        img.save(out, "JPEG", quality=90)
+        samples.append((f"synthetic {w}x{h}", out.getvalue()))
+    return samples
+
+
+def load_samples(paths):
+    samples = []
+    for path in paths:
+        files = [os.path.join(path, n) for n in sorted(os.listdir(path))] if os.path.isdir(path) else [path]
+        for f in files:
+            if f.lower().endswith((".jpg", ".jpeg", ".png")):
+                with open(f, "rb") as fh:
+                    samples.append((os.path.basename(f), fh.read()))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare thumbnail decode paths")
+    parser.add_argument("paths", nargs="*")
+    parser.add_argument("--size", type=int, default=110)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = load_samples(args.paths) if args.paths else synthetic_samples()
+    if not samples:
+        print("No images found")
+        return 1
+
+    decoders = [name for name in DECODERS if name != "turbojpeg" or TURBOJPEG_AVAILABLE]
+    print(f"{'image':<28}" + "".join(f"{name:>14}" for name in decoders))
+    totals = dict.fromkeys(decoders, 0.0)
+    for label, data in samples:
+        row = f"{label[:27]:<28}"
+        for name in decoders:
+            decode = DECODERS[name]
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                decode(data, args.size)
+            ms = (time.perf_counter() - start) * 1000 / args.repeat
+            totals[name] += ms
+            row += f"{ms:>12.2f}ms"
+        print(row)
+    print(f"{'total':<28}" + "".join(f"{totals[name]:>12.2f}ms" for name in decoders))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Regression check: cancelling a search must not fail an identical search sharing its request.
+
+A superseded search gives up its request. A later search for the same query that joined the
+request, or started one of its own, must still get the page instead of an error.
+
+Usage:
+    python -m tools.check_search_cancel [--latency 1500]
+
+Runs its own stand-in server and uses throwaway caches. Exits non-zero on failure.
+"""
+
+import os
+import sys
+import time
+import tempfile
+import argparse
+import threading
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from tools.standin_server import StandinConfig, create_server
+from services.async_core import dispatch, ASYNC_RESULT_EVENT
+from services.api_service import NasaApiService
+from services.response_cache import ResponseCache
+from services.local_index import LocalIndex
+
+
+def run(latency_ms, port):
+    config = StandinConfig(latency_ms=latency_ms)
+    server = create_server(config, port=port)
+    server.handle_error = lambda request, address: None  # The cancelled search resets its connection
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    tmp = tempfile.mkdtemp(prefix="nasa_check_")
+    api = NasaApiService(response_cache=ResponseCache(os.path.join(tmp, "responses")),
+                         local_index=LocalIndex(os.path.join(tmp, "index.db")))
+    api.base_url = config.base_url
+
+    results = {}
+
+    def recorder(name):
+        def _callback(items, api_log, error):
+            results.setdefault(name, []).append((len(items), error))
+        return _callback
+
+    def pump(seconds, until=lambda: False):
+        """Run search callbacks the way the app's event loop does."""
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline and not until():
+            for event in pygame.event.get():
+                if event.type == ASYNC_RESULT_EVENT:
+                    dispatch(event)
+            time.sleep(0.01)
+
+    # A starts, is superseded at 0.3 s; C asks for the same page while A's request is still open
+    a = api.media_cursor("jupiter", 20)
+    a.fetch_next(recorder("A"))
+    pump(0.3)
+    a.cancel()
+    pump(0.3)
+    c = api.media_cursor("jupiter", 20)
+    c.fetch_next(recorder("C"))
+
+    pump(latency_ms / 1000 * 4 + 5, until=lambda: "C" in results)
+    server.shutdown()
+
+    outcome = results.get("C")
+    print(f"A: {results.get('A')}  C: {outcome}")
+    return bool(outcome) and all(error is None for _, error in outcome) and outcome[-1][0] > 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that cancelled searches do not fail their followers")
+    parser.add_argument("--latency", type=float, default=1500, help="stand-in latency per request in ms")
+    parser.add_argument("--port", type=int, default=8799)
+    args = parser.parse_args()
+
+    pygame.display.init()  # Completions reach the callbacks through the pygame event queue
+    ok = run(args.latency, args.port)
+    print("OK" if ok else "FAILED: the surviving search reported an error")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the NASA Images API and its asset CDN.
+
+Serves deterministic synthetic data for /search, /album, /asset, /metadata and
+/captions, plus JPEG, MP3 and MP4 files under /assets with HTTP Range support.
+Latency, bandwidth, error rate and 429 throttling are configurable so every
+network path of the app can be exercised reproducibly.
+
+Usage:
+    python -m tools.standin_server --port 8765 --latency 80 --bandwidth 2048
+    NASA_API_BASE_URL=http://127.0.0.1:8765 NASA_ASSET_BASE_URL=http://127.0.0.1:8765/assets python main.py
+"""
+
+import io
+import re
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Rendition name -> longest image side in pixels
+IMAGE_RENDITIONS = {"orig": 4000, "large": 1920, "medium": 1280, "small": 640, "thumb": 320}
+MEDIA_TYPES = ["image", "video", "audio"]
+CENTERS = ["JSC", "KSC", "GSFC", "JPL", "MSFC", "ARC", "LaRC", "GRC", "HQ"]
+WORDS = ["apollo", "moon", "mars", "rover", "saturn", "nebula", "galaxy", "orbit", "launch", "shuttle",
+         "station", "earth", "jupiter", "hubble", "webb", "comet", "eclipse", "astronaut", "crew", "rocket"]
+
+
+class StandinConfig:
+    """Tunable behaviour of the stand-in server."""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, bandwidth_kbps=0, error_rate=0.0,
+                 throttle_rps=0, throttle_rate=0.0, total_hits=2000, seed=1):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.bandwidth_kbps = bandwidth_kbps  # 0 = unlimited; per response
+        self.error_rate = error_rate  # Fraction of requests answered with 500
+        self.throttle_rps = throttle_rps  # 0 = unlimited; requests/second before 429
+        self.throttle_rate = throttle_rate  # Fraction of requests answered with 429 regardless of rate
+        self.total_hits = total_hits
+        self.seed = seed
+        self.base_url = ""
+        self.asset_url = ""
+
+
+class _RateLimiter:
+    """Token bucket shared by all request threads."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def allow(self):
+        if self.rate <= 0:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class SyntheticData:
+    """Deterministic fake catalogue and media files."""
+
+    def __init__(self, config):
+        self.config = config
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def _rng(self, *parts):
+        digest = hashlib.sha1(":".join(str(p) for p in (self.config.seed,) + parts).encode()).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    @staticmethod
+    def nasa_id(query, index, media_type):
+        # The media type is encoded in the id so /asset can answer without a lookup
+        return f"SIM{media_type[0].upper()}-{hashlib.sha1(f'{query}:{index}'.encode()).hexdigest()[:10]}"
+
+    @staticmethod
+    def media_type_of(nasa_id):
+        return {"SIMV": "video", "SIMA": "audio"}.get(nasa_id.split("-", 1)[0], "image")
+
+    def item(self, query, index, media_type=None):
+        rng = self._rng(query, index)
+        media_type = media_type or rng.choice(MEDIA_TYPES)
+        nasa_id = self.nasa_id(query, index, media_type)
+        keywords = rng.sample(WORDS, 3) + ([query] if query else [])
+        title = " ".join(w.capitalize() for w in rng.sample(WORDS, 4))
+        year = rng.randint(1960, 2025)
+        data = {
+            "nasa_id": nasa_id,
+            "title": f"{title} {index}",
+            "description": " ".join(rng.choice(WORDS) for _ in range(60)),
+            "center": rng.choice(CENTERS),
+            "date_created": f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T00:00:00Z",
+            "media_type": media_type,
+            "keywords": keywords,
+            "photographer": "Stand-in Server",
+        }
+        return {
+            "href": f"{self.config.base_url}/asset/{nasa_id}",
+            "data": [data],
+            "links": [{"rel": "preview", "render": "image",
+                       "href": f"{self.config.asset_url}/{media_type}/{nasa_id}/{nasa_id}~thumb.jpg"}]
+        }
+
+    def collection(self, query, page, page_size, media_type=None, href=""):
+        total = self.config.total_hits
+        start = (page - 1) * page_size
+        items = [self.item(query, i, media_type) for i in range(start, min(start + page_size, total))]
+        links = []
+        if start + page_size < total:
+            links.append({"rel": "next", "prompt": "Next", "href": f"{href}&page={page + 1}"})
+        return {"collection": {"version": "1.0", "href": href, "items": items,
+                               "metadata": {"total_hits": total}, "links": links}}
+
+    def asset_manifest(self, nasa_id, media_type):
+        base = f"{self.config.asset_url}/{media_type}/{nasa_id}/{nasa_id}"
+        if media_type == "video":
+            names = ["~orig.mp4", "~large.mp4", "~thumb.jpg"]
+        elif media_type == "audio":
+            names = ["~orig.mp3", "~128k.mp3"]
+        else:
+            names = [f"~{r}.jpg" for r in IMAGE_RENDITIONS]
+        hrefs = [base + n for n in names]
+        hrefs.append(f"{self.config.asset_url}/{media_type}/{nasa_id}/metadata.json")
+        return {"collection": {"version": "1.0", "href": f"{self.config.base_url}/asset/{nasa_id}",
+                               "items": [{"href": h} for h in hrefs]}}
+
+    def file(self, path):
+        """Return (content_type, bytes) for an asset path, generating it on first use."""
+        with self._lock:
+            if path in self._files:
+                return self._files[path]
+
+        name = path.rsplit("/", 1)[-1]
+        if name == "metadata.json":
+            result = ("application/json", json.dumps({"AVAIL:Title": name, "File:FileSize": "synthetic"}).encode())
+        elif name.endswith(".srt"):
+            result = ("text/plain", b"1\n00:00:00,000 --> 00:00:05,000\nSynthetic caption\n")
+        elif name.endswith(".jpg"):
+            m = re.search(r"~(\w+)\.jpg$", name)
+            result = ("image/jpeg", self._jpeg(path, IMAGE_RENDITIONS.get(m.group(1) if m else "", 640)))
+        elif name.endswith(".mp3"):
+            result = ("audio/mpeg", self._mp3(30 if "128k" in name else 60))
+        elif name.endswith(".mp4"):
+            result = ("video/mp4", self._mp4(path))
+        else:
+            return None
+
+        with self._lock:
+            self._files[path] = result
+        return result
+
+    def _jpeg(self, key, side):
+        from PIL import Image, ImageDraw
+
+        rng = self._rng(key)
+        w, h = side, side * 3 // 4
+        img = Image.new("RGB", (w, h), (rng.randint(0, 60), rng.randint(0, 60), rng.randint(40, 120)))
+        draw = ImageDraw.Draw(img)
+        for _ in range(40):
+            x, y, r = rng.randint(0, w), rng.randint(0, h), rng.randint(2, max(3, side // 20))
+            draw.ellipse((x - r, y - r, x + r, y + r), fill=(rng.randint(120, 255),) * 3)
+        out = io.BytesIO()
+        img.save(out, "JPEG", quality=85)
+        return out.getvalue()
+
+    @staticmethod
+    def _mp3(seconds):
+        # Silent MPEG-1 Layer III frames, 128 kbps / 44.1 kHz (417 bytes, ~26 ms each)
+        frame = bytes([0xFF, 0xFB, 0x90, 0x64]) + bytes(413)
+        return frame * int(seconds * 38.28)
+
+    def _mp4(self, key, seconds=5):
+        try:
+            import os
+            import tempfile
+            import cv2
+            import numpy as np
+
+            fd, tmp = tempfile.mkstemp(suffix=".mp4")
+            os.close(fd)
+            writer = cv2.VideoWriter(tmp, cv2.VideoWriter_fourcc(*"mp4v"), 25, (640, 360))
+            for i in range(seconds * 25):
+                frame = np.zeros((360, 640, 3), dtype=np.uint8)
+                frame[:, :, 0] = (i * 5) % 255
+                cv2.circle(frame, (40 + i * 4 % 560, 180), 30, (255, 255, 255), -1)
+                writer.write(frame)
+            writer.release()
+            with open(tmp, "rb") as f:
+                data = f.read()
+            os.remove(tmp)
+            return data
+        except Exception:
+            # Without OpenCV serve a bare ftyp box padded to a realistic size
+            return b"\x00\x00\x00\x18ftypisom\x00\x00\x02\x00isomiso2" + bytes(2 * 1024 * 1024)
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Routes API and asset requests to the synthetic data."""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, so connection pooling can be measured
+    config = None
+    data = None
+    limiter = None
+    started = formatdate(time.time(), usegmt=True)
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def do_HEAD(self):
+        self._handle(head=True)
+
+    def do_GET(self):
+        self._handle(head=False)
+
+    def _handle(self, head):
+        cfg = self.config
+        if cfg.latency_ms or cfg.jitter_ms:
+            time.sleep(max(0.0, cfg.latency_ms + random.uniform(-cfg.jitter_ms, cfg.jitter_ms)) / 1000.0)
+
+        if not self.limiter.allow() or random.random() < cfg.throttle_rate:
+            self._send_json({"reason": "Too Many Requests"}, 429, head, {"Retry-After": "1"})
+            return
+        if random.random() < cfg.error_rate:
+            self._send_json({"reason": "Injected failure"}, 500, head)
+            return
+
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split("/") if p]
+
+        try:
+            if not parts:
+                self._send_json({"status": "ok"}, 200, head)
+            elif parts[0] == "search":
+                self._search(query, head)
+            elif parts[0] == "album" and len(parts) > 1:
+                page, page_size = self._paging(query)
+                body = self.data.collection(f"album:{parts[1]}", page, page_size, "image",
+                                            f"{cfg.base_url}/album/{parts[1]}?page_size={page_size}")
+                self._send_json(body, 200, head)
+            elif parts[0] == "asset" and len(parts) > 1:
+                self._send_json(self.data.asset_manifest(parts[1], self.data.media_type_of(parts[1])), 200, head)
+            elif parts[0] == "metadata" and len(parts) > 1:
+                media_type = self.data.media_type_of(parts[1])
+                self._send_json({"location": f"{cfg.asset_url}/{media_type}/{parts[1]}/metadata.json"}, 200, head)
+            elif parts[0] == "captions" and len(parts) > 1:
+                self._send_json({"location": f"{cfg.asset_url}/video/{parts[1]}/{parts[1]}.srt"}, 200, head)
+            elif parts[0] == "assets":
+                self._asset("/".join(parts[1:]), head)
+            else:
+                self._send_json({"reason": "Not found"}, 404, head)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception as e:
+            print(f"Stand-in error for {self.path}: {e}")
+            self._send_json({"reason": str(e)}, 500, head)
+
+    def _paging(self, query):
+        page = max(1, int(query.get("page", 1)))
+        page_size = max(1, min(100, int(query.get("page_size", 100))))
+        return page, page_size
+
+    def _search(self, query, head):
+        q = query.get("q", "").strip().lower()
+        page, page_size = self._paging(query)
+        media_types = query.get("media_type")
+        media_type = media_types if media_types in MEDIA_TYPES else None
+        href = f"{self.config.base_url}/search?q={q}&page_size={page_size}"
+        self._send_json(self.data.collection(q, page, page_size, media_type, href), 200, head)
+
+    def _asset(self, path, head):
+        found = self.data.file(path)
+        if not found:
+            self._send_json({"reason": "Not found"}, 404, head)
+            return
+        content_type, body = found
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", "application/octet-stream", head, {"ETag": etag})
+            return
+
+        headers = {"ETag": etag, "Accept-Ranges": "bytes", "Last-Modified": self.started}
+        m = re.match(r"bytes=(\d*)-(\d*)$", self.headers.get("Range", ""))
+        if m and (m.group(1) or m.group(2)):
+            if m.group(1):
+                start = int(m.group(1))
+                end = min(int(m.group(2)), len(body) - 1) if m.group(2) else len(body) - 1
+            else:
+                start, end = max(0, len(body) - int(m.group(2))), len(body) - 1
+            if start >= len(body) or start > end:
+                self._send(416, b"", content_type, head, {"Content-Range": f"bytes */{len(body)}"})
+                return
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+            self._send(206, body[start:end + 1], content_type, head, headers)
+            return
+        self._send(200, body, content_type, head, headers)
+
+    def _send_json(self, obj, status, head, headers=None):
+        body = json.dumps(obj).encode()
+        headers = dict(headers or {})
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if status == 200:
+            headers["ETag"] = etag
+            headers["Last-Modified"] = self.started
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, b"", "application/json", head, headers)
+                return
+        self._send(status, body, "application/json", head, headers)
+
+    def _send(self, status, body, content_type, head, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if head or not body:
+            return
+
+        rate = self.config.bandwidth_kbps * 1024
+        if rate <= 0:
+            self.wfile.write(body)
+            return
+        # Bandwidth cap: write in 10 ms slices
+        step = max(1, int(rate / 100))
+        for i in range(0, len(body), step):
+            self.wfile.write(body[i:i + step])
+            self.wfile.flush()
+            time.sleep(0.01)
+
+
+def create_server(config, host="127.0.0.1", port=8765):
+    """Build (but do not start) a stand-in server for config."""
+    config.base_url = f"http://{host}:{port}"
+    config.asset_url = f"{config.base_url}/assets"
+    data = SyntheticData(config)
+    handler = type("ConfiguredStandinHandler", (StandinHandler,),
+                   {"config": config, "data": data, "limiter": _RateLimiter(config.throttle_rps)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the NASA Images API and asset CDN")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0, help="added latency per request in ms")
+    parser.add_argument("--jitter", type=float, default=0, help="random +/- latency in ms")
+    parser.add_argument("--bandwidth", type=float, default=0, help="per-response cap in KiB/s (0 = unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failing with 500")
+    parser.add_argument("--throttle-rps", type=float, default=0, help="requests/s before answering 429")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--total-hits", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    config = StandinConfig(args.latency, args.jitter, args.bandwidth, args.error_rate,
+                           args.throttle_rps, args.throttle_rate, args.total_hits, args.seed)
+    server = create_server(config, args.host, args.port)
+    print(f"Stand-in API on {config.base_url}, assets on {config.asset_url}")
+    print(f"Run the app with NASA_API_BASE_URL={config.base_url} NASA_ASSET_BASE_URL={config.asset_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
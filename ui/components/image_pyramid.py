@@ -0,0 +1,93 @@
+import itertools
+import threading
+import pygame
+from app.config import PYRAMID_TILE_SIZE, PYRAMID_TILE_CACHE_BYTES
+from services.image_service import ImageCache
+
+
+class ImagePyramid:
+    """Tiled mipmap pyramid of a large surface; draws only the tiles visible in a viewport."""
+
+    # Shared so tiles of the previous image are evicted as the next one is viewed
+    tile_cache = ImageCache(PYRAMID_TILE_CACHE_BYTES, shards=1, name="tiles", weight=4.0)
+    _ids = itertools.count()
+
+    def __init__(self, surface, tile_size=PYRAMID_TILE_SIZE):
+        self.id = next(self._ids)  # Unlike id(), never reused for a later pyramid
+        self.source = surface
+        self.tile_size = tile_size
+        self.levels = [surface]  # Level n is the source halved n times
+        self.cancelled = False
+        self.thread = threading.Thread(target=self._build, daemon=True)
+        self.thread.start()
+
+    def _build(self):
+        """Halve the source until it fits in one tile; each level is usable as soon as it exists."""
+        level = self.source
+        while max(level.get_size()) > self.tile_size and not self.cancelled:
+            w, h = level.get_size()
+            level = pygame.transform.smoothscale(level, (max(1, w // 2), max(1, h // 2)))
+            self.levels.append(level)
+            pygame.event.post(pygame.event.Event(pygame.USEREVENT, {}))
+
+    def cancel(self):
+        self.cancelled = True
+
+    def level_bytes(self):
+        """Memory held by the reduced levels (the source belongs to the preview cache)."""
+        return sum(level.get_width() * level.get_height() * level.get_bytesize() for level in self.levels[1:])
+
+    def _level_for(self, scale):
+        """Smallest built level that still has at least as many pixels as the screen needs."""
+        src_w = self.source.get_width()
+        levels = self.levels
+        for index in range(len(levels) - 1, -1, -1):
+            if levels[index].get_width() / src_w >= scale:
+                return index, levels[index]
+        return 0, levels[0]
+
+    def draw(self, target, area, scale, top_left):
+        """Draw the source scaled by scale with its top-left corner at top_left, clipped to area."""
+        index, level = self._level_for(scale)
+        ratio = scale * self.source.get_width() / level.get_width()  # Level pixels -> screen pixels
+        lw, lh = level.get_size()
+        tile = self.tile_size
+        step = tile * ratio
+        ox, oy = top_left
+
+        visible = area.clip(target.get_rect())
+        first_col = max(0, int((visible.left - ox) // step))
+        last_col = min((lw - 1) // tile, int((visible.right - ox) // step))
+        first_row = max(0, int((visible.top - oy) // step))
+        last_row = min((lh - 1) // tile, int((visible.bottom - oy) // step))
+
+        old_clip = target.get_clip()
+        target.set_clip(visible)
+        try:
+            for row in range(first_row, last_row + 1):
+                y0 = int(row * tile * ratio)
+                y1 = int(min((row + 1) * tile, lh) * ratio)
+                for col in range(first_col, last_col + 1):
+                    x0 = int(col * tile * ratio)
+                    x1 = int(min((col + 1) * tile, lw) * ratio)
+                    if x1 <= x0 or y1 <= y0:
+                        continue
+                    surf = self._tile(index, level, col, row, (x1 - x0, y1 - y0))
+                    target.blit(surf, (ox + x0, oy + y0))
+        finally:
+            target.set_clip(old_clip)
+
+    def _tile(self, index, level, col, row, size):
+        tile = self.tile_size
+        rect = pygame.Rect(col * tile, row * tile, tile, tile).clip(level.get_rect())
+        # subsurface shares the level's pixels; only scaled tiles allocate memory
+        source = level.subsurface(rect)
+        if source.get_size() == size:
+            return source
+
+        key = (self.id, index, col, row, size)
+        surf = self.tile_cache.get(key)
+        if surf is None:
+            surf = pygame.transform.smoothscale(source, size)
+            self.tile_cache.put(key, surf)
+        return surf
@@ -44,6 +44,8 @@ class MediaPlayer:
         # Video dimensions for proper scaling
         self.video_width = 640
         self.video_height = 360
+        self._video_dest = None  # Reused destination surface for scaled video frames
+        self._video_dest_version = None  # (frame_version, source surface) scaled into _video_dest
 
         # Control rects (will be set in draw_controls)
         self.controls = {
@@ -323,8 +325,16 @@ class MediaPlayer:
         if self.media_type == "video" and self.video_player and self.video_player.is_playing:
             # Draw video frame using in-memory VLC surface
             video_surf = self.video_player.get_surface()
-            scaled = pygame.transform.smoothscale(video_surf, (area.width, area.height - self.control_bar_height))
-            self.screen.blit(scaled, (area.x, area.y))
+            size = (area.width, max(1, area.height - self.control_bar_height))
+            if self._video_dest is None or self._video_dest.get_size() != size:
+                self._video_dest = pygame.Surface(size, 0, video_surf)
+                self._video_dest_version = None
+            # Scale in place, and only when VLC has delivered a new frame
+            version = (getattr(self.video_player, "frame_version", None), video_surf)
+            if version[0] is None or version != self._video_dest_version:
+                pygame.transform.smoothscale(video_surf, size, self._video_dest)
+                self._video_dest_version = version
+            self.screen.blit(self._video_dest, (area.x, area.y))
         elif self.media_type == "audio":
             # For audio, draw a visualizer
             self._draw_audio_visualizer(area)
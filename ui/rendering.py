@@ -1,4 +1,6 @@
+from collections import OrderedDict
 import pygame
+from app.config import SCALED_SURFACE_CACHE_ENTRIES
 
 
 def render_text(text, font, color, max_width=None):
@@ -56,4 +58,29 @@ def render_text_lines(text, font, color, max_width, max_lines=2):
             last = last[:-1]
         lines[-1] = last + "..."
 
-    return [font.render(l, True, color) for l in lines]
\ No newline at end of file
+    return [font.render(l, True, color) for l in lines]
+
+class ScaledSurfaceCache:
+    """Small LRU of smoothscaled surfaces keyed by source identity, version and target size."""
+
+    def __init__(self, max_entries=SCALED_SURFACE_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # (id(source), version, size) -> (source, scaled)
+
+    def get(self, source, size, version=0):
+        """Return source scaled to size, reusing the result while source and version are unchanged."""
+        key = (id(source), version, size)
+        entry = self.entries.get(key)
+        # The entry holds a reference to its source, so a matching id really is the same surface
+        if entry is not None and entry[0] is source:
+            self.entries.move_to_end(key)
+            return entry[1]
+
+        scaled = pygame.transform.smoothscale(source, size)
+        self.entries[key] = (source, scaled)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return scaled
+
+    def clear(self):
+        self.entries.clear()
@@ -1,20 +1,24 @@
 import pygame
 import textwrap
 import webbrowser
-import requests
 import math
-from io import BytesIO
-from PIL import Image
-from app.config import BLACK, BLUE, WHITE
+from app.config import BLACK, BLUE, WHITE, PYRAMID_MIN_SIDE
 from ui.components.scrollable import ScrollableArea
-from ui.rendering import render_text
+from ui.rendering import render_text, ScaledSurfaceCache
 from utils.helpers import shorten_url
 from ui.components.media_player import MediaPlayer
+from ui.components.image_pyramid import ImagePyramid
+from services.http_client import get_http_client
+from services.progressive_image import ProgressiveImage, IMAGE_EXTENSIONS
+from services.detail_prefetcher import content_files, PrefetchWindow
+from services.cancellation import CancelToken
+from services.async_core import deliver
+from services.memory_governor import get_memory_governor, surface_bytes
 
 class DetailScreen:
     """Screen for displaying detailed information about a NASA item."""
 
-    def __init__(self, screen, width, height, fonts, image_service, audio_player, video_player):
+    def __init__(self, screen, width, height, fonts, image_service, audio_player, video_player, local_index=None):
         self.screen = screen
         self.WIDTH = width
         self.HEIGHT = height
@@ -22,6 +26,8 @@ class DetailScreen:
         self.image_service = image_service
         self.audio_player = audio_player
         self.video_player = video_player
+        self.http = get_http_client()
+        self.local_index = local_index  # Description and other fields search results do not keep
 
         # Detail view state
         self.detail_item = None
@@ -42,12 +48,76 @@ class DetailScreen:
         self.video_thumbnail = None
         self.preview_loading = False
         self.preview_surface = None
+        self.detail_thumbnail = None  # Gallery thumbnail, shown until a real rendition arrives
+        self.progressive = None  # ProgressiveImage for the image being shown
+        self.pyramid = None  # ImagePyramid of the large image being shown
+        self.scaled_cache = ScaledSurfaceCache()
+        self.session = CancelToken()  # Identity of the item being shown; cancelled when it is left
+        self.results = []  # Search results browsable with next/previous
+        self.result_index = None  # Position of detail_item in results
+        self.detail_fetcher_class = None
+        self.window = None  # PrefetchWindow around result_index
 
         # Unified media player
         self.media_player = MediaPlayer(screen, fonts, audio_player, video_player)
 
+        get_memory_governor().track("detail view", self._memory_bytes, release=self._release_memory)
+
+    def _memory_bytes(self):
+        """Bytes held by surfaces owned by this screen rather than by a cache."""
+        surfaces = [self.preview_surface, self.video_thumbnail]
+        surfaces += [area.content for area in (self.detail_desc_scroll, self.detail_files_scroll,
+                                               self.detail_meta_scroll, self.json_scroll) if area]
+        surfaces += [scaled for _, scaled in list(self.scaled_cache.entries.values())]
+        total = sum(surface_bytes(surf) for surf in surfaces if surf)
+        pyramid = self.pyramid
+        return total + (pyramid.level_bytes() if pyramid else 0)
+
+    def _release_memory(self):
+        """Drop state that is rebuilt on demand (called by the memory governor, off the draw thread)."""
+        pyramid = self.pyramid
+        self.pyramid = None
+        if pyramid:
+            pyramid.cancel()
+        self.scaled_cache = ScaledSurfaceCache()
+
+    def end_session(self):
+        """Stop all work for the item being shown; results still in flight are discarded."""
+        self.session.cancel()
+        if self.progressive:
+            self.progressive.cancel()
+        if self.pyramid:
+            self.pyramid.cancel()
+
+    def set_results(self, results, index):
+        """Make results browsable from the detail view, starting at results[index]."""
+        self.results = results
+        self.result_index = index
+
+    def show_result(self, index):
+        """Move to results[index], keeping its neighbours prefetched."""
+        if not 0 <= index < len(self.results) or index == self.result_index:
+            return
+        if self.media_player.is_playing:
+            self.media_player._stop_playback()
+        result = self.results[index]
+        ready = self.window is not None and self.window.ready(result.nasa_id)
+        self.result_index = index
+        self.set_detail_item(result.to_item(self.local_index.details(result.nasa_id) if self.local_index else None),
+                             self.detail_fetcher_class)
+        self.status = f"Item {index + 1} of {len(self.results)}" + (" (prefetched)" if ready else "")
+
+    def leave(self):
+        """End the session and drop the prefetch window when returning to the gallery."""
+        self.end_session()
+        if self.window:
+            self.window.clear()
+
     def set_detail_item(self, item, detail_fetcher_class):
         """Set the current item for the detail view."""
+        self.end_session()
+        self.session = session = CancelToken()
+        self.detail_fetcher_class = detail_fetcher_class
         self.detail_item = item
         self.detail_asset = {}
         self.detail_metadata = {}
@@ -61,6 +131,12 @@ class DetailScreen:
         self.current_preview_url = None
         self.preview_surface = None
         self.preview_loading = False
+        self.progressive = None
+        self.pyramid = None
+        self.scaled_cache.clear()
+        preview_href = next((link.get("href") for link in item.get("links", [])
+                             if link.get("rel") == "preview"), None)
+        self.detail_thumbnail = self.image_service.image_cache.get(preview_href) if preview_href else None
 
         # Reset all scroll areas
         self.detail_desc_scroll = None
@@ -72,46 +148,55 @@ class DetailScreen:
         nasa_id = d.get("nasa_id")
         is_video = (d.get("media_type") == "video")
 
+        # Callbacks run on the pygame thread. Each checks its own session: results for an item
+        # already left are dropped
+        def on_video_thumbnail(thumbnail, error):
+            if session.cancelled or thumbnail is None:
+                return
+            self.video_thumbnail = thumbnail
+
         def on_asset(asset):
+            if session.cancelled:
+                return
             self.detail_asset = asset
-            # If this is a video, try to get a thumbnail
+            # If this is a video, grab a frame on the I/O executor for a thumbnail
             if is_video:
                 best_video_url = self.get_best_video_url()
                 if best_video_url:
-                    self.video_thumbnail = self.video_player.get_thumbnail(best_video_url)
-            pygame.event.post(pygame.event.Event(pygame.USEREVENT, {}))
+                    deliver(self.image_service.core.submit_blocking(
+                        self.video_player.get_thumbnail, best_video_url, token=session), on_video_thumbnail)
 
         def on_metadata(metadata):
+            if session.cancelled:
+                return
             self.detail_metadata = metadata
             pygame.event.post(pygame.event.Event(pygame.USEREVENT, {}))
 
         def on_captions(captions):
+            if session.cancelled:
+                return
             self.detail_captions = captions
             pygame.event.post(pygame.event.Event(pygame.USEREVENT, {}))
 
-        detail_fetcher_class(nasa_id, is_video, on_asset, on_metadata, on_captions).start()
-
-
-    def _filter_asset_files(self, files):
-        """Filter out metadata files from the asset files."""
-        if not files:
-            return []
+        def on_complete(timings):
+            if session.cancelled:
+                return
+            parts = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings.items())
+            self.status = f"Details loaded: {parts}"
+            pygame.event.post(pygame.event.Event(pygame.USEREVENT, {}))
 
-        filtered = []
-        for file in files:
-            url = file.get("href", "")
-            filename = url.split("/")[-1].lower()
+        detail_fetcher_class(nasa_id, is_video, on_asset, on_metadata, on_captions,
+                             on_complete=on_complete, token=session).start()
 
-            # Skip metadata files and other non-content files
-            if (filename.endswith(".json") or
-                    "metadata" in filename or
-                    filename.endswith(".txt") or
-                    filename.endswith(".xml")):
-                continue
+        if self.result_index is not None and self.result_index < len(self.results):
+            if self.window is None:
+                self.window = PrefetchWindow(self.image_service, detail_fetcher_class)
+            self.window.slide(self.results, self.result_index)
 
-            filtered.append(file)
 
-        return filtered
+    def _filter_asset_files(self, files):
+        """Filter out metadata files from the asset files."""
+        return content_files(files)
 
     def get_best_image_url(self):
         """Get the best available image URL for the current item."""
@@ -179,8 +264,17 @@ class DetailScreen:
                 if self.media_player.is_playing:
                     self.media_player._stop_playback()
                     return True
+                self.leave()
                 return False  # Signal to exit detail mode
 
+            # Previous/next search result
+            if event.key == pygame.K_COMMA and self.result_index is not None:
+                self.show_result(self.result_index - 1)
+                return True
+            if event.key == pygame.K_PERIOD and self.result_index is not None:
+                self.show_result(self.result_index + 1)
+                return True
+
         # Handle media player controls
         if self.media_player.handle_event(event):
             return True
@@ -274,26 +368,33 @@ class DetailScreen:
             if url and url != self.current_preview_url:
                 self.current_preview_url = url
                 self.preview_surface = None
+
+                if url.lower().endswith(IMAGE_EXTENSIONS):
+                    # Images load progressively without blocking the preview area
+                    self._progressive_for(url)
+                    self.status = f"Loading: {url.split('/')[-1]}"
+                    return
+
                 self.preview_loading = True
 
                 # Start a new thread to load the preview
                 import threading
-                thread = threading.Thread(target=self._load_preview_thread, args=(url,))
+                thread = threading.Thread(target=self._load_preview_thread, args=(url, self.session))
                 thread.daemon = True
                 thread.start()
 
                 # Update status
                 self.status = f"Loading: {url.split('/')[-1]}"
 
-    def _load_preview_thread(self, url):
+    def _load_preview_thread(self, url, session):
         """Thread function to load a preview of the selected asset."""
         try:
-            if url.endswith(('.jpg', '.jpeg', '.png', '.gif', '.bmp')):
-                # Load as image
-                self._load_image_preview(url)
-            elif url.endswith(('.mp4', '.avi', '.mov', '.webm')):
+            if url.endswith(('.mp4', '.avi', '.mov', '.webm')):
                 # Load as video thumbnail
-                self.video_thumbnail = self.video_player.get_thumbnail(url)
+                thumbnail = self.video_player.get_thumbnail(url, token=session)
+                if session.cancelled:
+                    return
+                self.video_thumbnail = thumbnail
             elif url.endswith(('.mp3', '.wav', '.ogg', '.flac', '.m4a')):
                 # For audio, we just display the player UI
                 pass
@@ -306,23 +407,27 @@ class DetailScreen:
             pygame.event.post(pygame.event.Event(pygame.USEREVENT, {}))
 
         except Exception as e:
+            if session.cancelled:
+                return  # A later item owns preview_loading now
             print(f"Error loading preview: {str(e)}")
             self.preview_loading = False
 
-    def _load_image_preview(self, url):
-        """Load and prepare an image preview."""
-        try:
-            response = requests.get(url)
-            img = Image.open(BytesIO(response.content))
-            img = img.convert("RGBA")
-            mode = img.mode
-            size = img.size
-            data = img.tobytes()
-            surf = pygame.image.fromstring(data, size, mode)
-            self.preview_surface = surf
-            self.image_service.image_cache.put(url, surf)
-        except Exception as e:
-            print(f"Error loading image preview: {str(e)}")
+    def _progressive_for(self, url):
+        """Return the progressive loader for url, replacing the one for a previous image."""
+        if self.progressive and self.progressive.target_url == url:
+            return self.progressive
+
+        placeholder = self.detail_thumbnail
+        if self.progressive:
+            # Keep showing the previous rendition of this item until the new one arrives
+            placeholder = self.progressive.surface or placeholder
+            self.progressive.cancel()
+
+        hrefs = [f.get("href", "") for f in self.detail_asset.get("collection", {}).get("items", [])] \
+            if self.detail_asset else []
+        self.progressive = ProgressiveImage(self.image_service, url, hrefs, placeholder)
+        self.progressive.start()
+        return self.progressive
 
     def play_media(self, url):
         """Play the appropriate media type based on the URL."""
@@ -384,6 +489,9 @@ class DetailScreen:
                                             preview_area.centery - loading_text.get_height() // 2))
         elif selected_url and selected_url == self.current_preview_url:
             self._draw_selected_file_preview(selected_url, preview_area)
+        elif not self.detail_asset and media_type == "image" and self.detail_thumbnail:
+            # Asset list still loading: show the gallery thumbnail right away
+            self._draw_surface_in_area(self.detail_thumbnail, preview_area, upscale=True)
         else:
             # Default preview (original asset)
             file_url_img = self.get_best_image_url() if media_type == "image" else None
@@ -419,12 +527,9 @@ class DetailScreen:
 
     def _draw_selected_file_preview(self, url, area):
         """Draw a preview of the selected file."""
-        if url.endswith(('.jpg', '.jpeg', '.png', '.gif', '.bmp')):
+        if url.lower().endswith(IMAGE_EXTENSIONS):
             # Image preview
-            if self.preview_surface:
-                self._draw_surface_in_area(self.preview_surface, area)
-            else:
-                self._draw_image_preview(url, area)
+            self._draw_image_preview(url, area)
         elif url.endswith(('.mp4', '.avi', '.mov', '.webm')):
             # Video preview
             if self.video_thumbnail:
@@ -462,7 +567,7 @@ class DetailScreen:
         elif url.endswith('.json'):
             # JSON preview (metadata)
             try:
-                with requests.get(url) as response:
+                with self.http.get(url) as response:
                     json_data = response.json()
                     json_text = str(json_data)
                     json_surf = render_text(json_text, self.fonts["detail_asset"], BLUE, area.width - 40)
@@ -513,14 +618,16 @@ class DetailScreen:
                     webbrowser.open(url)
                     self.status = f"Opened in browser: {url}"
 
-    def _draw_surface_in_area(self, surface, area):
-        """Draw a surface within the provided area with proper scaling."""
+    def _draw_surface_in_area(self, surface, area, upscale=False):
+        """Draw a surface within the provided area with proper scaling; return the scale used."""
         if not surface:
-            return
+            return None
 
-        # Calculate scale to fit within the area while maintaining aspect ratio
+        # Calculate scale to fit within the area while maintaining aspect ratio;
+        # stand-ins for a larger image (upscale=True) are stretched to the size it will have
         w, h = surface.get_size()
-        scale = min(area.width / w, area.height / h, 1.0) * self.detail_zoom
+        fit = min(area.width / w, area.height / h)
+        scale = (fit if upscale else min(fit, 1.0)) * self.detail_zoom
 
         # Don't scale up tiny images too much
         if scale > 4.0:
@@ -532,17 +639,26 @@ class DetailScreen:
 
         # Scale the surface
         try:
-            if scale != 1.0:
-                scaled_surf = pygame.transform.smoothscale(surface, (new_w, new_h))
-            else:
-                scaled_surf = surface
-
             # Calculate position to center in area
             tx = area.x + (area.width - new_w) // 2 + self.detail_img_offset[0]
             ty = area.y + (area.height - new_h) // 2 + self.detail_img_offset[1]
 
-            # Draw
-            self.screen.blit(scaled_surf, (tx, ty))
+            if max(w, h) >= PYRAMID_MIN_SIDE:
+                # Huge images: draw only the visible tiles from the nearest mipmap level
+                pyramid = self.pyramid
+                if pyramid is None or pyramid.source is not surface:
+                    if pyramid:
+                        pyramid.cancel()
+                    pyramid = self.pyramid = ImagePyramid(surface)
+                pyramid.draw(self.screen, area, scale, (tx, ty))
+            else:
+                if scale != 1.0:
+                    scaled_surf = self.scaled_cache.get(surface, (new_w, new_h))
+                else:
+                    scaled_surf = surface
+
+                # Draw
+                self.screen.blit(scaled_surf, (tx, ty))
 
             # Optional: Draw image dimensions
             dim_text = self.fonts["small"].render(f"{w}x{h} ({int(scale * 100)}%)", True, (120, 180, 255))
@@ -550,26 +666,20 @@ class DetailScreen:
 
         except Exception as e:
             print(f"Error scaling image: {str(e)}")
+        return scale
 
     def _draw_image_preview(self, url, area):
-        """Draw the image preview within the given area."""
-        surf = self.image_service.image_cache.get(url)
-        if not surf:
-            try:
-                response = requests.get(url)
-                img = Image.open(BytesIO(response.content))
-                img = img.convert("RGBA")
-                mode = img.mode
-                size = img.size
-                data = img.tobytes()
-                surf = pygame.image.fromstring(data, size, mode)
-                self.image_service.image_cache.put(url, surf)
-            except Exception as e:
-                print(f"Error loading image: {str(e)}")
-                surf = None
-
-        if surf:
-            self._draw_surface_in_area(surf, area)
+        """Draw the best rendition of the image loaded so far within the given area."""
+        progressive = self._progressive_for(url)
+        if progressive.surface:
+            scale = self._draw_surface_in_area(progressive.surface, area, upscale=not progressive.final)
+            if scale:
+                # Zoomed past the pixels of the current rendition: now the original is worth fetching
+                progressive.maybe_request_full(scale)
+        elif progressive.failed:
+            failed = self.fonts["medium"].render("Preview unavailable", True, BLUE)
+            self.screen.blit(failed, (area.centerx - failed.get_width() // 2,
+                                      area.centery - failed.get_height() // 2))
         else:
             loading = self.fonts["medium"].render("Loading preview...", True, BLUE)
             self.screen.blit(loading, (area.centerx - loading.get_width() // 2,
@@ -947,7 +1057,9 @@ class DetailScreen:
 
     def _draw_description_panel(self, x, y, width, height, data):
         """Draw the description panel."""
-        desc = data.get("description", "No description available")
+        # Results not in the local index get their description from the item's metadata document
+        desc = (data.get("description") or self.detail_metadata.get("AVAIL:Description")
+                or "No description available")
         desc_title = self.fonts["medium"].render("Description:", True, BLUE)
         self.screen.blit(desc_title, (x, y))
         y += desc_title.get_height() + 5
@@ -1058,7 +1170,7 @@ class DetailScreen:
         pygame.draw.rect(self.screen, (14, 18, 24), meta_rect, border_radius=8)
 
         # Render metadata
-        md = self.detail_metadata if self.detail_metadata else {}
+        md = dict(self.detail_metadata) if self.detail_metadata else {}
 
         # Use data from detail_item if available
         if self.detail_item and "data" in self.detail_item and self.detail_item["data"]:
@@ -1135,7 +1247,7 @@ class DetailScreen:
         elif self.audio_player.playing:
             nav_text = "Space pause/play | ←/→ seek -/+ 10sec | S stop | ESC stop audio"
         else:
-            nav_text = "ESC exit | +/- zoom | ←/→/↑/↓ navigation | ↑/↓ select file | "
+            nav_text = "ESC exit | ,/. prev/next item | +/- zoom | ←/→/↑/↓ navigation | ↑/↓ select file | "
             if media_type == "audio":
                 nav_text += "P play audio | S stop | "
             elif media_type == "video":
@@ -1154,7 +1266,7 @@ class DetailScreen:
                 nav_text1 = "Space pause/play | ←/→ seek -/+ 10sec"
                 nav_text2 = "S stop | ESC stop audio"
             else:
-                nav_text1 = "ESC exit | +/- zoom | ←/→/↑/↓ navigation | ↑/↓ select file"
+                nav_text1 = "ESC exit | ,/. prev/next item | +/- zoom | ←/→/↑/↓ navigation | ↑/↓ select file"
                 nav_text2 = "P play media | S stop | Enter open in browser | PageUp/Down scroll description"
 
             nav_surf1 = self.fonts["small"].render(nav_text1, True, (120, 180, 255))
@@ -2,6 +2,11 @@ import pygame
 import math
 from app.config import BLACK, BLUE, WHITE, API_PANEL_BG
 from ui.rendering import render_text_lines
+from services.single_flight import total_deduplicated
+from services.thumbnail_loader import ThumbnailLoader
+from services.detail_prefetcher import DetailPrefetcher
+from services.image_service import DetailFetcher
+from services.memory_governor import get_memory_governor
 
 
 class SearchScreen:
@@ -36,7 +41,12 @@ class SearchScreen:
         self.status = "Ready"
         self.thumb_urls = []
         self.thumb_loaded = set()
+        self.thumb_loader = ThumbnailLoader(image_service, self.thumbnail_size)
+        self.prefetcher = DetailPrefetcher(image_service, DetailFetcher)
         self.rects_ui = {}
+        self.cursor = None  # SearchCursor for lazily fetching further API pages
+        self.local_results = []  # Matches from the local index for the current query
+        self.pending_page_advance = False
 
         # Tracking for auto-search
         self.last_keyword = ""
@@ -57,30 +67,117 @@ class SearchScreen:
         self.images = items
         self.current_page = 0
         self.selected_idx = 0
+        self.pending_page_advance = False
         self.api_log = api_log
 
         if error:
-            self.status = f"Error fetching: {error}"
             self.loading = False
+            if self.local_results:
+                # Network unavailable: keep working against the local index
+                self.attach_cursor(None)
+                self.set_local_results(self.local_results, searching=False)
+                self.status = f"Offline: showing {len(self.local_results)} local matches ({error})"
+                return
+            self.thumb_loader.cancel()
+            self.status = f"Error fetching: {error}"
             return
 
-        self.status = f"Found {len(self.images_json)} assets for keyword '{self.input_keyword}'."
+        self.status = f"Found {self.result_count()} assets for keyword '{self.input_keyword}'."
         self.thumb_urls = []
         self.thumb_loaded = set()
+        self._load_thumbnails(0)
 
-        for idx, item in enumerate(self.images):
-            image_url = None
-            if "links" in item:
-                for link in item["links"]:
-                    if link.get("rel") == "preview" and "href" in link:
-                        image_url = link["href"]
-                        break
-            self.thumb_urls.append(image_url)
-            if image_url:
-                if self.image_service.image_cache.get(image_url) is None:
-                    self.image_service.fetch_and_notify_thumb(image_url, idx)
+        self.loading = False
+        self._prefetch_ahead()
 
+    def set_local_results(self, results, searching=True):
+        """Show matches from the local index, e.g. while the remote search is in flight."""
+        self.local_results = results
+        if not results:
+            return
+
+        self.images_json = results
+        self.images = results
+        self.current_page = 0
+        self.selected_idx = 0
+        self.thumb_urls = []
+        self.thumb_loaded = set()
+        self._load_thumbnails(0)
+
+        if searching:
+            self.status = f"{len(results)} local matches, searching NASA..."
+        else:
+            self.status = f"Offline: showing {len(results)} local matches."
+
+    def extend_search_results(self, cursor, items, api_log, error=None):
+        """Append a further API page of results without resetting the view."""
+        if cursor is not self.cursor:
+            return  # Results of a superseded search
+
+        if error:
+            self.status = f"Error fetching more results: {error}"
+            self.pending_page_advance = False
+            pygame.event.post(pygame.event.Event(pygame.USEREVENT, {}))
+            return
+
+        self.images_json = items
+        self.images = items
+        self.api_log = api_log
         self.loading = False
+        self.status = f"Found {self.result_count()} assets for keyword '{self.input_keyword}'."
+        self._load_thumbnails(self._first_changed_index())
+
+        if self.pending_page_advance:
+            self.pending_page_advance = False
+            self.next_page()
+        pygame.event.post(pygame.event.Event(pygame.USEREVENT, {}))
+
+    def attach_cursor(self, cursor):
+        """Make cursor the source of results; its follow-up deliveries extend the view."""
+        self.cursor = cursor
+        if cursor:
+            cursor.on_update = lambda items, api_log, error: self.extend_search_results(cursor, items, api_log, error)
+
+    def _first_changed_index(self):
+        """Index from which self.images no longer matches the loaded thumbnail URLs."""
+        for idx, url in enumerate(self.thumb_urls):
+            if idx >= len(self.images) or self.images[idx].preview_href != url:
+                del self.thumb_urls[idx:]
+                return idx
+        return len(self.thumb_urls)
+
+    def result_count(self):
+        """Total number of results, including API pages not fetched yet."""
+        total = self.cursor.total() if self.cursor and self.images is not self.local_results else None
+        return total if total is not None else len(self.images)
+
+    def _load_thumbnails(self, start):
+        """Resolve preview URLs for items from index start on and queue their thumbnails."""
+        for idx in range(start, len(self.images)):
+            self.thumb_urls.append(self.images[idx].preview_href)
+        self._schedule_thumbnails()
+
+    def _schedule_thumbnails(self):
+        """Queue thumbnails of the visible page first, then the next page; drop the rest."""
+        cache = self.image_service.image_cache
+        start = self.current_page * self.images_per_page
+        middle = start + self.images_per_page
+        end = middle + self.images_per_page
+        visible = [url for url in self.thumb_urls[start:middle] if url and url not in cache]
+        prefetch = [url for url in self.thumb_urls[middle:end] if url and url not in cache]
+        self.thumb_loader.schedule(visible, prefetch)
+
+    def _fetch_more(self):
+        """Request the next API page of the current search."""
+        cursor = self.cursor
+        if cursor and cursor.has_more():
+            cursor.fetch_next(lambda items, api_log, error: self.extend_search_results(cursor, items, api_log, error))
+
+    def _prefetch_ahead(self):
+        """Keep one gallery page beyond the next one loaded."""
+        if self.cursor and self.cursor.has_more():
+            if (self.current_page + 2) * self.images_per_page > len(self.images):
+                self._fetch_more()
 
     def handle_input(self, event):
         """Handle input events for the search screen."""
@@ -164,7 +261,8 @@ class SearchScreen:
                 elif event.key == pygame.K_RETURN:
                     if 0 <= self.selected_idx < count:
                         idx = self.current_page * self.images_per_page + self.selected_idx
-                        return "detail", self.images[idx]
+                        self.prefetcher.opened(self.images[idx].nasa_id)
+                        return "detail", self.images[idx], idx
                 elif event.key == pygame.K_PAGEUP:
                     self.prev_page()
                 elif event.key == pygame.K_PAGEDOWN:
@@ -196,18 +294,50 @@ class SearchScreen:
 
         return None
 
+    def focused_result(self):
+        """The result under the mouse pointer, else the selected card while the gallery has focus."""
+        start = self.current_page * self.images_per_page
+        if pygame.mouse.get_focused():
+            pos = pygame.mouse.get_pos()
+            for i, rect in enumerate(self.rects_ui.get("gallery_grid", [])):
+                if rect.collidepoint(pos) and start + i < len(self.images):
+                    return self.images[start + i]
+        if self.inputs[self.active_control] == "gallery" and 0 <= start + self.selected_idx < len(self.images):
+            return self.images[start + self.selected_idx]
+        return None
+
+    def update_prefetch(self):
+        """Speculatively prefetch the details of the focused card once visible thumbnails are in."""
+        self.prefetcher.focus(self.focused_result(), idle=not self.thumb_loader.queued())
+
+    def select_result(self, index):
+        """Show the gallery page holding result index with that card selected."""
+        if index is None or not 0 <= index < len(self.images):
+            return
+        page, self.selected_idx = divmod(index, self.images_per_page)
+        if page != self.current_page:
+            self.current_page = page
+            self._schedule_thumbnails()
+
     def prev_page(self):
         """Go to previous page of results."""
         if self.current_page > 0:
             self.current_page -= 1
             self.selected_idx = 0
+            self._schedule_thumbnails()
 
     def next_page(self):
-        """Go to next page of results."""
-        total_pages = max(1, math.ceil(len(self.images) / self.images_per_page))
-        if self.current_page < total_pages - 1:
+        """Go to next page of results, fetching it from the API if needed."""
+        loaded_pages = max(1, math.ceil(len(self.images) / self.images_per_page))
+        if self.current_page < loaded_pages - 1:
             self.current_page += 1
             self.selected_idx = 0
+            self._schedule_thumbnails()
+        elif self.cursor and self.cursor.has_more():
+            self.pending_page_advance = True
+            self.status = "Loading more results..."
+            self._fetch_more()
+        self._prefetch_ahead()
 
     def draw(self):
         """Draw the search screen."""
@@ -248,7 +378,10 @@ class SearchScreen:
         item_height = thumb + 45
         grid_rows = max(1, (h - spacing_y) // (item_height + spacing_y))
 
-        self.images_per_page = grid_cols * grid_rows
+        if self.images_per_page != grid_cols * grid_rows:
+            # Window resized: a different set of thumbnails is now visible
+            self.images_per_page = grid_cols * grid_rows
+            self._schedule_thumbnails()
         start_idx = self.current_page * self.images_per_page
         end_idx = min(start_idx + self.images_per_page, len(self.images))
 
@@ -272,7 +405,7 @@ class SearchScreen:
             image_url = self.thumb_urls[item_idx] if item_idx < len(self.thumb_urls) else None
 
             if image_url:
-                surf = self.image_service.image_cache.get(image_url)
+                surf = self.image_service.image_cache.peek(image_url)
                 if surf is None:
                     loading_surf = self.fonts["small"].render("Loading...", True, BLUE)
                     self.screen.blit(loading_surf, (cx + (thumb - loading_surf.get_width()) // 2,
@@ -287,26 +420,13 @@ class SearchScreen:
                                           cy + (thumb - no_img.get_height()) // 2))
 
             # Draw item metadata
-            title = "No title"
-            center = ""
-            date = ""
-
-            if "data" in item and item["data"]:
-                d = item["data"][0]
-                if "title" in d:
-                    title = d["title"]
-                if "center" in d:
-                    center = d["center"]
-                if "date_created" in d:
-                    date = d["date_created"][:10]
-
             title_max_width = thumb - 8
-            title_lines = render_text_lines(title, self.fonts["small"], BLUE, title_max_width, max_lines=2)
+            title_lines = render_text_lines(item.title, self.fonts["small"], BLUE, title_max_width, max_lines=2)
 
             for j, surf in enumerate(title_lines):
                 self.screen.blit(surf, (cx + 4, cy + thumb + 4 + j * 16))
 
-            meta = f"{center} {date}"
+            meta = item.meta
             meta_surf = self.fonts["gallery_meta"].render(meta, True, (110, 190, 255))
 
             if meta_surf.get_width() > title_max_width:
@@ -316,6 +436,24 @@ class SearchScreen:
 
             self.screen.blit(meta_surf, (cx + 4, cy + thumb + 4 + len(title_lines) * 16))
 
+    def _image_cache_line(self):
+        stats = self.image_service.image_cache.stats()
+        encoded = self.image_service.encoded_cache.stats()
+        return (f"Thumbnails: {stats['entries']} ({stats['bytes'] // (1024 * 1024)}/"
+                f"{stats['max_bytes'] // (1024 * 1024)} MB), hit rate {stats['hit_rate']:.0%}, "
+                f"evicted {stats['evictions']}; compressed {encoded['entries']} "
+                f"({encoded['bytes'] // (1024 * 1024)} MB, hit rate {encoded['hit_rate']:.0%})")
+
+    def _memory_line(self):
+        stats = get_memory_governor().stats()
+        return (f"Media memory: {stats['total'] // (1024 * 1024)}/{stats['budget'] // (1024 * 1024)} MB, "
+                f"governor evictions {stats['evictions']}")
+
+    def _prefetch_line(self):
+        stats = self.prefetcher.stats()
+        return (f"Detail prefetch: {stats['started']} started, {stats['cancelled']} cancelled, "
+                f"hit rate {stats['hit_rate']:.0%} ({stats['ready']} ready on open)")
+
     def draw_api_panel(self, x, y, w, h):
         """Draw the API response panel."""
         pygame.draw.rect(self.screen, API_PANEL_BG, (x, y, w, h), border_radius=12)
@@ -335,6 +473,11 @@ class SearchScreen:
             f"Method: {log.get('method', '')}",
             f"Status: {log.get('status', '')}",
             f"Params: {log.get('params', '')}",
+            f"Cache: {log.get('cache', '-')}",
+            f"Coalesced requests: {total_deduplicated()}",
+            self._image_cache_line(),
+            self._memory_line(),
+            self._prefetch_line(),
             "Response (fragment):"
         ]
 
@@ -342,6 +485,10 @@ class SearchScreen:
         snippet_lines = response_snippet.split('\n')
         all_lines = log_lines + snippet_lines
 
+        # The snippet is raw JSON without line breaks; wrap everything to the panel width
+        max_chars = max(10, (w - 36) // max(1, self.fonts["api"].size("M")[0]))
+        all_lines = [line[i:i + max_chars] for line in all_lines for i in range(0, max(1, len(line)), max_chars)]
+
         max_lines = (h - 40) // 18
         for i, line in enumerate(all_lines[:max_lines]):
             txt = self.fonts["api"].render(line, True, WHITE)
@@ -383,7 +530,7 @@ class SearchScreen:
 
     def draw_page_nav(self, y):
         """Draw pagination navigation."""
-        total_pages = max(1, (len(self.images) + self.images_per_page - 1) // self.images_per_page)
+        total_pages = max(1, (self.result_count() + self.images_per_page - 1) // self.images_per_page)
         page_text = f"Page: {self.current_page + 1} of {total_pages}"
         page_surf = self.fonts["medium"].render(page_text, True, BLUE)
         x = 40
@@ -445,6 +592,6 @@ class SearchScreen:
 
     def draw_nav_info(self, y):
         """Draw navigation help info."""
-        nav_text = "F11 - fullscreen | F12 - windowed | Tab - next field | Enter - search/select | Esc - exit"
+        nav_text = "F9 - offline | F11 - fullscreen | F12 - windowed | Tab - next field | Enter - search/select | Esc - exit"
         nav_surf = self.fonts["small"].render(nav_text, True, (120, 180, 255))
         self.screen.blit(nav_surf, (self.WIDTH // 2 - nav_surf.get_width() // 2, y))
\ No newline at end of file
@@ -1,14 +1,14 @@
-import requests
 from PIL import Image
 from io import BytesIO
 import pygame
+from services.http_client import get_http_client
 
 def fetch_image_surface(url, thumb_size, image_cache):
     cached = image_cache.get(url)
     if cached:
         return cached
     try:
-        response = requests.get(url)
+        response = get_http_client().get(url)
         response.raise_for_status()
         img = Image.open(BytesIO(response.content))
         img = img.convert("RGBA")